@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv, find_dotenv
-from pymysql.cursors import DictCursor
+from pymysql.cursors import Cursor
 
 # Load environment variables from the .env file
 os.environ.pop("USER", None) # Prevent conflict with system USER variable
@@ -12,13 +12,60 @@ MYSQL_CONFIG = {
     "user": os.getenv("USER"),
     "password": os.getenv("PASSWORD"),
     "database": os.getenv("DATABASE"),
-    "cursorclass": DictCursor,
+    # Plain tuple cursor: rows are wrapped in a compact ResultSet by DBConnection.
+    "cursorclass": Cursor,
+    # Client-side limits: a stalled server can never block the console for longer.
+    "connect_timeout": int(os.getenv("MYSQL_CONNECT_TIMEOUT", "5")),
+    "read_timeout": int(os.getenv("MYSQL_READ_TIMEOUT", "30")),
+    "write_timeout": int(os.getenv("MYSQL_WRITE_TIMEOUT", "30")),
 }
 
+# Default per-statement deadline in seconds (see RawQueries.DEADLINES), enforced by
+# the server through a MAX_EXECUTION_TIME hint.
+QUERY_DEADLINE_DEFAULT = 5
+
+# When a search hits its deadline, return the first page of matches instead of nothing.
+PARTIAL_RESULTS_ENABLED = True
+PARTIAL_RESULTS_DEADLINE = 2
+
+# Consecutive timeouts before MySQL queries fail fast, and seconds until a trial query.
+CIRCUIT_BREAKER_FAILURES = 3
+CIRCUIT_BREAKER_RESET_SECONDS = 30
+
+# Optional read replicas ("host" or "host:port", comma separated). SELECT queries are
+# routed across them; HOST is only used when every replica is unavailable.
+READ_HOSTS = [host.strip() for host in os.getenv("READ_HOSTS", "").split(",") if host.strip()]
+
+# Replica selection: "round_robin" or "least_latency".
+REPLICA_STRATEGY = os.getenv("REPLICA_STRATEGY", "round_robin")
+
+# Seconds a failed replica stays out of rotation before it is health-checked again.
+REPLICA_EJECT_SECONDS = 30
+
+# Incrementally refresh the film_search projection when the console starts
+# (needs CREATE/INSERT/DELETE privileges on the primary HOST).
+FILM_SEARCH_REFRESH_ON_START = os.getenv("FILM_SEARCH_REFRESH_ON_START", "1") == "1"
+
 # SQLite database file path for query logging.
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SQLITE_DB_PATH = os.path.join(BASE_DIR, "db", "queries_log.db")
 
+# How long (seconds) SQLite waits on a locked log file before giving up,
+# and how many times a failed log write is retried when several instances share it.
+SQLITE_BUSY_TIMEOUT = 10
+SQLITE_WRITE_RETRIES = 5
+
+# Identifier of this console instance in merged query logs (generated per log file if unset).
+NODE_ID = os.getenv("NODE_ID")
+
+# Number of rows copied per transaction when merging query logs from many nodes.
+MERGE_BATCH_SIZE = 10000
+
+# Directory of the memory-mapped columnar snapshot of queries_log used by the charts,
+# and the number of log rows read per batch when appending to it.
+LOG_ANALYTICS_DIR = os.path.join(BASE_DIR, "db", "analytics")
+LOG_ANALYTICS_BATCH_SIZE = 50000
+
 # Number of top queries to retrieve in GET_TOP_QUERIES.
 TOP_QUERIES_LIMIT = 5
 
@@ -27,3 +74,34 @@ MAX_KEYWORDS_BUBBLE = 10
 
 # Default page size for paginated results
 PAGE_SIZE = 10
+
+# Incremental (search-as-you-type) mode for actor and keyword lookups: seconds a cached
+# result set may be narrowed locally.
+INCREMENTAL_SEARCH_ENABLED = True
+INCREMENTAL_CACHE_TTL = 60
+
+# Seconds the genre/year facet counts shown in the menus are cached.
+FACET_CACHE_TTL = 300
+
+# Maximum number of values sent in one batch search statement.
+BATCH_SEARCH_MAX_VALUES = 500
+
+# Minimum trigram similarity (0-1) for a fuzzy "did you mean" suggestion.
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Maximum number of fuzzy suggestions returned per lookup.
+FUZZY_SUGGESTIONS_LIMIT = 5
+
+# Number of background workers that prefetch movie details during pagination.
+PREFETCH_WORKERS = 2
+
+# Opt-in profiling of menu handlers and task calls (PROFILE=1 in .env or the environment).
+PROFILING_ENABLED = os.getenv("PROFILE", "0") == "1"
+PROFILE_REPORT_DIR = os.path.join(BASE_DIR, "profiles")
+
+# Number of functions listed per handler in the cProfile section of the report.
+PROFILE_TOP_FUNCTIONS = 15
+
+# Opt-in recording of console sessions for load replay (RECORD_SESSIONS=1).
+RECORD_SESSIONS = os.getenv("RECORD_SESSIONS", "0") == "1"
+SESSION_RECORD_DIR = os.path.join(BASE_DIR, "sessions")
@@ -0,0 +1,60 @@
+import time
+from config import CIRCUIT_BREAKER_FAILURES, CIRCUIT_BREAKER_RESET_SECONDS
+
+# MySQL errors raised when a statement hits its deadline: 3024 = MAX_EXECUTION_TIME
+# exceeded, 1317 = query interrupted, 2013 = lost connection (client read timeout).
+SERVER_TIMEOUT_ERRORS = (3024, 1317)
+CLIENT_TIMEOUT_ERRORS = (2013,)
+
+
+# Returns True if a PyMySQL error means the query ran out of time.
+# A lost connection counts too: the breaker treats a dead server like a hanging one.
+def is_query_timeout(error: Exception) -> bool:
+    code = error.args[0] if error.args else None
+    return code in SERVER_TIMEOUT_ERRORS or code in CLIENT_TIMEOUT_ERRORS
+
+
+# Returns True only if the statement itself hit a deadline: a server timeout, or a
+# lost connection caused by the client read timeout (PyMySQL reports it as 2013
+# "... (timed out)"). A 2013 from a crashed or reset server returns False.
+def is_deadline_exceeded(error: Exception) -> bool:
+    code = error.args[0] if error.args else None
+    if code in SERVER_TIMEOUT_ERRORS:
+        return True
+    if code not in CLIENT_TIMEOUT_ERRORS:
+        return False
+    message = str(error.args[1]).lower() if len(error.args) > 1 else ""
+    return "timed out" in message or isinstance(error.__context__, TimeoutError)
+
+
+# Fails fast after repeated query timeouts instead of letting every search hang.
+# closed: queries run normally; open: queries are rejected immediately;
+# half-open: after the reset period one trial query is let through.
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = CIRCUIT_BREAKER_FAILURES,
+                 reset_seconds: float = CIRCUIT_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    # Returns True if a query may run now.
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
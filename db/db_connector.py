@@ -1,34 +1,117 @@
 import sqlite3
 from pymysql import connect
 from pymysql.err import OperationalError
-from config import SQLITE_DB_PATH
+from config import SQLITE_DB_PATH, SQLITE_BUSY_TIMEOUT, PARTIAL_RESULTS_ENABLED, PARTIAL_RESULTS_DEADLINE
+from db.result_set import ResultSet
+from db.replica_router import ReplicaRouter
+from db.circuit_breaker import CircuitBreaker, is_query_timeout
+from db.raw_queries import RawQueries
 
 
 # Handles MySQL and SQLite database connections and operations.
 class DBConnection:
-    # Now MySQL can be disabled if not needed
-    def __init__(self, use_mysql=True, **kwargs):
+    # Now MySQL can be disabled if not needed.
+    # With read_hosts, SELECT queries are routed across the replicas first.
+    def __init__(self, use_mysql=True, read_hosts: list[str] = None, **kwargs):
         self.connection = None
+        self.router = None
+        self.breaker = CircuitBreaker()
 
         if use_mysql:
+            if read_hosts:
+                self.router = ReplicaRouter(read_hosts, **kwargs)
             try:
                 self.connection = connect(**kwargs)
             except OperationalError as e:
                 print(f"Database connection failed: {e}")
 
-    # Executes a SELECT query in MySQL
-    def execute_select(self, query: str, params: tuple = ()):
+    # Executes a SELECT query in MySQL and returns a compact ResultSet.
+    # Every statement runs with a server-side deadline (RawQueries.DEADLINES). On timeout
+    # a search returns the first page of matches if possible (RawQueries.PARTIAL_RESULTS_QUERIES),
+    # and after repeated timeouts the circuit breaker rejects queries until the server recovers.
+    # Failed queries return an empty ResultSet with partial=True, so callers can tell
+    # "no rows" from "rows unknown".
+    def execute_select(self, query: str, params: tuple = (), deadline: float = None) -> ResultSet:
+        if not self.breaker.allow():
+            print("Database is not responding. Please try again shortly.")
+            return ResultSet(partial=True)
+
+        deadline = deadline or RawQueries.deadline_for(query)
+        try:
+            result = self._select(RawQueries.with_max_execution_time(query, deadline), params)
+        except OperationalError as e:
+            if not is_query_timeout(e):
+                raise
+            self.breaker.record_failure()
+            print(f"Query timed out after {deadline}s.")
+            if not RawQueries.allows_partial(query):
+                return ResultSet(partial=True)
+            return self._first_page(query, params)
+
+        self.breaker.record_success()
+        return result
+
+    # Runs a SELECT on a read replica, falling back to the primary connection.
+    def _select(self, query: str, params: tuple) -> ResultSet:
+        if self.router:
+            result = self.router.execute(query, params)
+            if result is not None:
+                return result
         if not self.connection:
             print("MySQL connection not available.")
-            return []
+            return ResultSet(partial=True)
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(query, params)
+                columns = tuple(col[0] for col in cursor.description or ())
+                return ResultSet(columns, cursor.fetchall())
+        except OperationalError:
+            # A client read timeout drops the connection; reconnect for the next query.
+            try:
+                self.connection.ping(reconnect=True)
+            except OperationalError:
+                pass
+            raise
+
+    # Partial-results mode: fetches only the first page of a timed-out search.
+    def _first_page(self, query: str, params: tuple) -> ResultSet:
+        page_query = RawQueries.first_page(query) if PARTIAL_RESULTS_ENABLED else None
+        if not page_query:
+            return ResultSet(partial=True)
+        try:
+            result = self._select(RawQueries.with_max_execution_time(page_query, PARTIAL_RESULTS_DEADLINE), params)
+        except OperationalError as e:
+            if not is_query_timeout(e):
+                raise
+            return ResultSet(partial=True)
+        result.partial = True
+        return result
+
+    # Executes a data-changing statement on the primary MySQL server and commits it.
+    # With commit=False the statement joins the open transaction; finish it with
+    # commit() or rollback(). Returns the number of affected rows.
+    def execute(self, query: str, params: tuple = (), commit: bool = True) -> int:
+        if not self.connection:
+            print("MySQL connection not available.")
+            return 0
         with self.connection.cursor() as cursor:
-            cursor.execute(query, params)
-            return cursor.fetchall()
+            affected = cursor.execute(query, params)
+        if commit:
+            self.connection.commit()
+        return affected
+
+    def commit(self):
+        if self.connection:
+            self.connection.commit()
+
+    def rollback(self):
+        if self.connection:
+            self.connection.rollback()
 
     # Executes a SELECT query in SQLite
     def execute_sqlite_select(self, query: str, params: tuple = ()):
         try:
-            conn = sqlite3.connect(SQLITE_DB_PATH)
+            conn = sqlite3.connect(SQLITE_DB_PATH, timeout=SQLITE_BUSY_TIMEOUT)
             cursor = conn.cursor()
             cursor.execute(query, params)
             result = cursor.fetchall()
@@ -40,5 +123,7 @@ class DBConnection:
 
     # Closes the database connection.
     def close(self):
+        if self.router:
+            self.router.close()
         if self.connection:
             self.connection.close()
@@ -0,0 +1,163 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+from config import MERGE_BATCH_SIZE, SQLITE_BUSY_TIMEOUT
+from db.migrations import LATEST_VERSION, get_version, migrate
+
+
+# Combines query logs from many console instances into one analytics database.
+# The target uses the same normalized schema as the node logs; query types and
+# search terms are matched by name/text, and a per-file watermark of the last
+# copied event ID means merging the same file twice (or a file that grew since
+# the last merge) never duplicates data. Files are identified by the random log_id
+# in their log_meta, never by the user-settable NODE_ID, which copies of .env share.
+class LogMerger:
+
+    # Last event ID copied from each log file.
+    MERGE_PROGRESS_TABLE = """
+    CREATE TABLE IF NOT EXISTS merge_progress (
+        log_id TEXT PRIMARY KEY,
+        node_id TEXT,
+        last_source_id INTEGER NOT NULL
+    );
+    """
+
+    COPY_QUERY_TYPES = """
+    INSERT OR IGNORE INTO query_types (name)
+    SELECT name FROM src.query_types;
+    """
+
+    # Interns the node's search terms, remapping type_id to the merged IDs.
+    COPY_SEARCH_TERMS = """
+    INSERT OR IGNORE INTO search_terms (type_id, genre, production_year, keyword, search_text)
+    SELECT qt.id, st.genre, st.production_year, st.keyword, st.search_text
+    FROM src.search_terms AS st
+    JOIN src.query_types AS sqt ON sqt.id = st.type_id
+    JOIN query_types AS qt ON qt.name = sqt.name
+    ORDER BY st.id;
+    """
+
+    # Copies one id range of search_events, remapping term_id and type_id to the merged IDs.
+    COPY_EVENTS = """
+    INSERT INTO search_events (term_id, type_id, executed_at)
+    SELECT t.id, t.type_id, e.executed_at
+    FROM src.search_events AS e
+    JOIN src.search_terms AS st ON st.id = e.term_id
+    JOIN src.query_types AS sqt ON sqt.id = st.type_id
+    JOIN query_types AS qt ON qt.name = sqt.name
+    JOIN search_terms AS t ON t.type_id = qt.id AND t.search_text = st.search_text
+    WHERE e.id > ? AND e.id <= ?
+    ORDER BY e.id;
+    """
+
+    SAVE_PROGRESS = """
+    INSERT INTO merge_progress (log_id, node_id, last_source_id) VALUES (?, ?, ?)
+    ON CONFLICT (log_id) DO UPDATE SET last_source_id = excluded.last_source_id;
+    """
+
+    def __init__(self, target_path: str, batch_size: int = MERGE_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(target_path, timeout=SQLITE_BUSY_TIMEOUT, uri=True)
+        self.connection.execute("PRAGMA journal_mode=WAL;")
+        migrate(self.connection)
+        with self.connection:
+            self.connection.execute(self.MERGE_PROGRESS_TABLE)
+
+    # Reads a log_meta value of the attached log (None if missing).
+    def _source_meta(self, key: str) -> str | None:
+        try:
+            row = self.connection.execute("SELECT value FROM src.log_meta WHERE key = ?;", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        return row[0] if row else None
+
+    # Returns the last event ID already merged from a log file.
+    def _last_source_id(self, log_id: str) -> int:
+        row = self.connection.execute(
+            "SELECT last_source_id FROM merge_progress WHERE log_id = ?;", (log_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    # Copies new events from the attached log in id ranges; each batch and its
+    # watermark are committed together.
+    def _copy_events(self, log_id: str, node_id: str) -> int:
+        last_id = self._last_source_id(log_id)
+        max_id = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM src.search_events;").fetchone()[0]
+        inserted = 0
+        for low in range(last_id, max_id, self.batch_size):
+            high = min(low + self.batch_size, max_id)
+            with self.connection:
+                cursor = self.connection.execute(self.COPY_EVENTS, (low, high))
+                self.connection.execute(self.SAVE_PROGRESS, (log_id, node_id, high))
+                inserted += cursor.rowcount
+        return inserted
+
+    # Merges one node log into the target database and returns the number of events added.
+    # Logs on an older schema are migrated on a temporary copy; the node file is only read.
+    def merge(self, source_path: str) -> int:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            if self._needs_migration(source_path):
+                attach_path = os.path.join(tmp_dir, os.path.basename(source_path))
+                self._migrated_copy(source_path, attach_path)
+            else:
+                attach_path = source_path
+
+            self.connection.execute("ATTACH DATABASE ? AS src;", (f"file:{attach_path}?mode=ro",))
+            try:
+                # Logs written before log_id existed are identified by their path.
+                log_id = self._source_meta("log_id") or f"file:{os.path.abspath(source_path)}"
+                node_id = self._source_meta("node_id")
+                with self.connection:
+                    self.connection.execute(self.COPY_QUERY_TYPES)
+                    self.connection.execute(self.COPY_SEARCH_TERMS)
+                return self._copy_events(log_id, node_id)
+            finally:
+                self.connection.execute("DETACH DATABASE src;")
+
+    # Copies a log with the backup API (consistent even with a live WAL) and migrates the copy.
+    @staticmethod
+    def _migrated_copy(source_path: str, copy_path: str):
+        source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+        copy = sqlite3.connect(copy_path)
+        try:
+            source.backup(copy)
+            migrate(copy)
+        finally:
+            copy.close()
+            source.close()
+
+    @staticmethod
+    def _needs_migration(source_path: str) -> bool:
+        source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+        try:
+            return get_version(source) < LATEST_VERSION
+        finally:
+            source.close()
+
+    # Closes the target database connection.
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge query logs from many nodes into one analytics database.")
+    parser.add_argument("target", help="Path of the merged analytics database (created if missing).")
+    parser.add_argument("sources", nargs="+", help="Node query log files (queries_log.db) to merge.")
+    parser.add_argument("--batch-size", type=int, default=MERGE_BATCH_SIZE, help="Events per transaction.")
+    args = parser.parse_args()
+
+    merger = LogMerger(args.target, args.batch_size)
+    try:
+        for source in args.sources:
+            try:
+                events = merger.merge(source)
+                print(f"{source}: {events} searches merged.")
+            except (sqlite3.Error, OSError) as e:
+                print(f"{source}: merge failed: {e}")
+    finally:
+        merger.close()
+
+
+if __name__ == "__main__":
+    main()
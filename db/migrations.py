@@ -0,0 +1,162 @@
+import argparse
+import sqlite3
+
+# Display text of a search term, shared by the v2 data migration (SQL) and QueryLogger.
+SEARCH_TEXT_SQL = """
+    COALESCE(CASE query_type
+        WHEN 'genre' THEN 'Genre: ' || genre
+        WHEN 'year' THEN 'Year: ' || production_year
+        WHEN 'keyword' THEN 'Keyword: ' || keyword
+        WHEN 'genre_year' THEN 'Genre: ' || genre || ', Year: ' || production_year
+        WHEN 'actor' THEN 'Actor: ' || keyword
+        ELSE COALESCE(keyword, genre, production_year, '')
+    END, '')
+"""
+
+# Versioned schema migrations of the SQLite query log: (version, description, statements).
+# The applied version is stored in PRAGMA user_version; never edit a released migration,
+# append a new one instead.
+MIGRATIONS = [
+    (1, "Baseline query log tables", [
+        """
+        CREATE TABLE IF NOT EXISTS queries_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            genre TEXT,
+            production_year INTEGER,
+            keyword TEXT,
+            query_type TEXT NOT NULL,
+            executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS keywords_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            query_id INTEGER,
+            keyword TEXT NOT NULL,
+            recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS log_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        """,
+    ]),
+    (2, "Normalized log: query_types and search_terms dimensions, search_events facts", [
+        """
+        CREATE TABLE query_types (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        """,
+        # One row per distinct searched value; search_text is built once, not per query.
+        """
+        CREATE TABLE search_terms (
+            id INTEGER PRIMARY KEY,
+            type_id INTEGER NOT NULL REFERENCES query_types (id),
+            genre TEXT,
+            production_year INTEGER,
+            keyword TEXT,
+            search_text TEXT NOT NULL,
+            UNIQUE (type_id, search_text)
+        );
+        """,
+        # One compact row per search; executed_at is epoch seconds (UTC).
+        # AUTOINCREMENT: ids are never reused, so id watermarks (log merges, the
+        # analytics snapshot) cannot skip events after the newest rows were deleted.
+        """
+        CREATE TABLE search_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            term_id INTEGER NOT NULL REFERENCES search_terms (id),
+            type_id INTEGER NOT NULL REFERENCES query_types (id),
+            executed_at INTEGER NOT NULL
+        );
+        """,
+        # Covering indexes: top queries (by term, by type + term) and time ranges.
+        "CREATE INDEX idx_search_events_term ON search_events (term_id);",
+        "CREATE INDEX idx_search_events_type_term ON search_events (type_id, term_id);",
+        "CREATE INDEX idx_search_events_executed_at ON search_events (executed_at);",
+        """
+        INSERT INTO query_types (name)
+        SELECT DISTINCT query_type FROM queries_log;
+        """,
+        f"""
+        INSERT OR IGNORE INTO search_terms (type_id, genre, production_year, keyword, search_text)
+        SELECT qt.id, q.genre, q.production_year, q.keyword, {SEARCH_TEXT_SQL}
+        FROM queries_log AS q
+        JOIN query_types AS qt ON qt.name = q.query_type
+        ORDER BY q.id;
+        """,
+        # Event ids keep the old queries_log ids, so existing watermarks stay valid.
+        f"""
+        INSERT INTO search_events (id, term_id, type_id, executed_at)
+        SELECT q.id, st.id, st.type_id, CAST(strftime('%s', q.executed_at) AS INTEGER)
+        FROM (SELECT *, {SEARCH_TEXT_SQL} AS search_text FROM queries_log) AS q
+        JOIN query_types AS qt ON qt.name = q.query_type
+        JOIN search_terms AS st ON st.type_id = qt.id AND st.search_text = q.search_text;
+        """,
+        # keywords_log only duplicated the keyword searches already in queries_log.
+        "DROP TABLE queries_log;",
+        "DROP TABLE keywords_log;",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# Returns the schema version of an SQLite database.
+def get_version(connection: sqlite3.Connection) -> int:
+    return connection.execute("PRAGMA user_version;").fetchone()[0]
+
+
+# Applies all pending migrations, each in its own transaction. BEGIN IMMEDIATE takes
+# the write lock first, so concurrent instances never apply the same migration twice.
+# Returns the number of migrations applied.
+def migrate(connection: sqlite3.Connection) -> int:
+    isolation_level = connection.isolation_level
+    connection.isolation_level = None  # Manage transactions explicitly (DDL included)
+    applied = 0
+    try:
+        for version, _, statements in MIGRATIONS:
+            if get_version(connection) >= version:
+                continue
+            connection.execute("BEGIN IMMEDIATE;")
+            try:
+                if get_version(connection) < version:
+                    for statement in statements:
+                        connection.execute(statement)
+                    connection.execute(f"PRAGMA user_version = {version};")
+                    applied += 1
+                connection.execute("COMMIT;")
+            except sqlite3.Error:
+                connection.execute("ROLLBACK;")
+                raise
+        if applied:
+            try:
+                connection.execute("VACUUM;")  # Give the space of dropped tables back
+            except sqlite3.OperationalError:
+                pass  # Another instance is using the file; the space is reused later
+    finally:
+        connection.isolation_level = isolation_level
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate SQLite query log files to the latest schema.")
+    parser.add_argument("paths", nargs="+", help="Query log files (queries_log.db).")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        connection = sqlite3.connect(path)
+        try:
+            applied = migrate(connection)
+            print(f"{path}: {applied} migrations applied, schema version {get_version(connection)}.")
+        except sqlite3.Error as e:
+            print(f"{path}: migration failed: {e}")
+        finally:
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,125 @@
 import sqlite3
-import os
+import time
+import uuid
+from config import SQLITE_DB_PATH, SQLITE_BUSY_TIMEOUT, SQLITE_WRITE_RETRIES, NODE_ID
+from db.migrations import migrate
 
-# Handles logging search queries into the SQLite database.
-class QueryLogger:
-    DB_PATH = os.path.abspath(os.path.join("db", "queries_log.db"))
+# Display text stored once per search term (same text as the v2 migration builds in SQL).
+SEARCH_TEXT_FORMATS = {
+    "genre": "Genre: {genre}",
+    "year": "Year: {production_year}",
+    "keyword": "Keyword: {keyword}",
+    "genre_year": "Genre: {genre}, Year: {production_year}",
+    "actor": "Actor: {keyword}",
+}
+
+
+# Returns the display text of a search term.
+def search_text(query_type: str, genre: str = None, production_year: int = None, keyword: str = None) -> str:
+    template = SEARCH_TEXT_FORMATS.get(query_type)
+    if template is None:
+        return str(next((value for value in (keyword, genre, production_year) if value is not None), ""))
+    return template.format(genre=genre, production_year=production_year, keyword=keyword)
 
-    QUERIES_LOG_TABLE = """
-    CREATE TABLE IF NOT EXISTS queries_log (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        genre TEXT,  
-        production_year INTEGER,  
-        keyword TEXT,
-        query_type TEXT NOT NULL,
-        executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    """
 
-    # Adds a table for storing searched keywords.
-    KEYWORDS_LOG_TABLE = """
-    CREATE TABLE IF NOT EXISTS keywords_log (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        query_id INTEGER,
-        keyword TEXT NOT NULL,
-        recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    """
+# Handles logging search queries into the SQLite database.
+# Several console instances may share the same log file, so the database runs in
+# WAL mode with a busy timeout and writes are retried while the file is locked.
+# The schema is versioned (see db/migrations.py): every search is one search_events
+# row pointing at an interned search_terms row.
+class QueryLogger:
+    DB_PATH = SQLITE_DB_PATH
 
-    # Initializes the connection to the SQLite database and ensures the tables exist.
-    def __init__(self):
+    # Initializes the connection to the SQLite database and brings the schema up to date.
+    def __init__(self, db_path: str = None):
+        self.node_id = None
+        self.type_ids = {}  # query_type -> id (ids never change once created)
+        self.term_ids = {}  # (type_id, search_text) -> id
         try:
-            self.connection = sqlite3.connect(self.DB_PATH)
+            self.connection = sqlite3.connect(db_path or self.DB_PATH, timeout=SQLITE_BUSY_TIMEOUT)
             self.cursor = self.connection.cursor()
-            with self.connection:
-                self.cursor.execute(self.QUERIES_LOG_TABLE)  # Ensures queries_log exists
-                self.cursor.execute(self.KEYWORDS_LOG_TABLE)  # Ensures keywords_log exists
+            self.cursor.execute("PRAGMA journal_mode=WAL;")
+            self.cursor.execute("PRAGMA synchronous=NORMAL;")
+            migrate(self.connection)
+            self.node_id = self._init_node_id()
         except sqlite3.Error as e:
             print(f"Database connection failed: {e}")
             self.connection = None
 
-    # Logs a search query into the database and saves keywords if applicable.
+    # Returns the node ID of this log file, creating it on first use. Besides the
+    # (user-settable, possibly shared) node name, every file gets a random log_id that
+    # identifies it when logs are merged.
+    def _init_node_id(self) -> str:
+        with self.connection:
+            self.cursor.execute(
+                "INSERT OR IGNORE INTO log_meta (key, value) VALUES ('log_id', ?);", (uuid.uuid4().hex,)
+            )
+            self.cursor.execute(
+                "INSERT OR IGNORE INTO log_meta (key, value) VALUES ('node_id', ?);",
+                (NODE_ID or uuid.uuid4().hex,)
+            )
+        self.cursor.execute("SELECT value FROM log_meta WHERE key = 'node_id';")
+        return self.cursor.fetchone()[0]
+
+    # Runs `write(cursor)` in its own transaction, retrying while another instance holds the lock.
+    def _write(self, write):
+        if not self.connection:
+            return None
+        for attempt in range(SQLITE_WRITE_RETRIES):
+            try:
+                with self.connection:
+                    return write(self.cursor)
+            except sqlite3.OperationalError as e:
+                # Ids cached during the rolled-back transaction may not exist.
+                self.type_ids.clear()
+                self.term_ids.clear()
+                message = str(e).lower()
+                if ("locked" not in message and "busy" not in message) or attempt == SQLITE_WRITE_RETRIES - 1:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+        return None
+
+    # Returns the id of a query type, creating it if needed.
+    def _type_id(self, cursor, query_type: str) -> int:
+        type_id = self.type_ids.get(query_type)
+        if type_id is None:
+            cursor.execute("INSERT OR IGNORE INTO query_types (name) VALUES (?);", (query_type,))
+            cursor.execute("SELECT id FROM query_types WHERE name = ?;", (query_type,))
+            type_id = self.type_ids[query_type] = cursor.fetchone()[0]
+        return type_id
+
+    # Returns the id of a search term, interning it on first use.
+    def _term_id(self, cursor, type_id: int, genre, production_year, keyword, text: str) -> int:
+        term_id = self.term_ids.get((type_id, text))
+        if term_id is None:
+            cursor.execute("""
+                INSERT OR IGNORE INTO search_terms (type_id, genre, production_year, keyword, search_text)
+                VALUES (?, ?, ?, ?, ?);
+                """, (type_id, genre, production_year, keyword, text))
+            cursor.execute("SELECT id FROM search_terms WHERE type_id = ? AND search_text = ?;", (type_id, text))
+            term_id = self.term_ids[(type_id, text)] = cursor.fetchone()[0]
+        return term_id
+
+    # Logs a search query into the database.
     def log_query(self, genre: str = None, production_year: int = None, keyword: str = None, query_type: str = "") -> int:
-        try:
-            with self.connection:
-                self.cursor.execute("""
-                INSERT INTO queries_log (genre, production_year, keyword, query_type) 
-                VALUES (?, ?, ?, ?);
-                """, (genre, production_year, keyword, query_type))
+        text = search_text(query_type, genre, production_year, keyword)
 
-                query_id = self.cursor.lastrowid  # Gets the ID of the inserted query
-                return query_id  # Returns the query ID for further use.
+        def write(cursor):
+            type_id = self._type_id(cursor, query_type)
+            term_id = self._term_id(cursor, type_id, genre, production_year, keyword, text)
+            cursor.execute("""
+                INSERT INTO search_events (term_id, type_id, executed_at)
+                VALUES (?, ?, CAST(strftime('%s', 'now') AS INTEGER));
+                """, (term_id, type_id))
+            return cursor.lastrowid
 
+        try:
+            return self._write(write)  # Returns the event ID for further use.
         except sqlite3.Error as e:
             print(f"Failed to log query: {e}")
             return None  # Returns None if logging fails.
 
-    # Logs a keyword search into the keywords_log table.
-    def log_keyword(self, query_id: int, keyword: str) -> None:
-        try:
-            with self.connection:
-                self.cursor.execute("""
-                INSERT INTO keywords_log (query_id, keyword) 
-                VALUES (?, ?);
-                """, (query_id, keyword))
-        except sqlite3.Error as e:
-            print(f"Failed to log keyword: {e}")
-
     # Closes the database connection.
     def close(self) -> None:
         if self.connection:
-            self.connection.close()
\ No newline at end of file
+            self.connection.close()
@@ -1,30 +1,115 @@
+import re
+from config import QUERY_DEADLINE_DEFAULT, PAGE_SIZE
+
+
 # Stores raw SQL queries for various searches in the sakila database.
 class RawQueries:
 
+    # Deadline in seconds per statement (by attribute name); others use QUERY_DEADLINE_DEFAULT.
+    DEADLINES = {
+        "GET_GENRES": 2,
+        "GET_YEAR_RANGE": 2,
+        "GET_MATCHING_ACTORS": 3,
+        "GET_MOVIE_DETAILS": 3,
+        "GET_FACET_COUNTS": 5,
+        "GET_MOVIES_BY_KEYWORD": 8,
+        "GET_FILM_SEARCH_TEXT": 15,
+        "GET_ALL_ACTORS": 15,
+        "GET_MOVIES_BY_KEYWORDS": 20,
+        "GET_MOVIES_BY_GENRES": 10,
+        "GET_MOVIES_BY_YEARS": 10,
+        "GET_MOVIES_BY_ACTORS": 20,
+    }
+
+    # Searches that may return their first page when they time out (partial-results mode).
+    # Every other statement fails on timeout: a truncated genre list, index or facet
+    # table would look complete to its callers.
+    PARTIAL_RESULTS_QUERIES = (
+        "GET_MOVIES_BY_GENRE",
+        "GET_MOVIES_BY_GENRE_YEAR",
+        "GET_MOVIES_BY_YEAR",
+        "GET_MOVIES_BY_KEYWORD",
+        "GET_MOVIES_BY_ACTOR",
+    )
+
+    # Returns True if a timed-out statement may fall back to its first page.
+    @classmethod
+    def allows_partial(cls, query: str) -> bool:
+        return any(getattr(cls, name) is query for name in cls.PARTIAL_RESULTS_QUERIES)
+
+    # Returns the deadline (seconds) of a statement or query template.
+    @classmethod
+    def deadline_for(cls, query: str) -> float:
+        for name, seconds in cls.DEADLINES.items():
+            if getattr(cls, name) is query:
+                return seconds
+        return QUERY_DEADLINE_DEFAULT
+
+    # Adds a server-side MAX_EXECUTION_TIME hint to a SELECT statement.
+    @staticmethod
+    def with_max_execution_time(query: str, seconds: float) -> str:
+        return re.sub(r"^\s*SELECT\b", f"SELECT /*+ MAX_EXECUTION_TIME({int(seconds * 1000)}) */",
+                      query, count=1, flags=re.IGNORECASE)
+
+    # Rewrites a SELECT to return only the first `limit` matches: without ORDER BY the
+    # server can stop scanning as soon as it has found them.
+    @staticmethod
+    def first_page(query: str, limit: int = PAGE_SIZE) -> str | None:
+        if re.search(r"\bLIMIT\b", query, flags=re.IGNORECASE):
+            return None
+        query = re.sub(r"\s+ORDER BY[^;]*;?\s*$", "", query.rstrip().rstrip(";"), flags=re.IGNORECASE)
+        return f"{query} LIMIT {int(limit)};"
+
+    # Builds a derived table of `count` parameter rows for the batch search queries.
+    @staticmethod
+    def values_table(count: int) -> str:
+        return " UNION ALL ".join(["SELECT %s AS value"] * count)
+
     # Retrieves all available genres from the category table.
     GET_GENRES = """
         SELECT name AS genre
         FROM category;
         """
 
-    # Retrieves movies by genre.
+    # Retrieves movies by genre from the film_search projection (every genre of a film counts).
     GET_MOVIES_BY_GENRE = """
-        SELECT f.title, f.release_year, c.name AS genre
-        FROM film AS f
-        LEFT JOIN film_category AS fc ON f.film_id = fc.film_id
-        LEFT JOIN category AS c ON fc.category_id = c.category_id
-        WHERE LOWER(c.name) = LOWER(%s)
-        ORDER BY f.release_year DESC;
+        SELECT fs.title, fs.release_year, g.genre
+        FROM film_search_genre AS g
+        JOIN film_search AS fs ON fs.film_id = g.film_id
+        WHERE g.genre = %s
+        ORDER BY fs.release_year DESC;
+        """
+
+    # Retrieves movies by genre and production year from the film_search projection.
+    GET_MOVIES_BY_GENRE_YEAR = """
+        SELECT fs.title, fs.release_year, g.genre
+        FROM film_search_genre AS g
+        JOIN film_search AS fs ON fs.film_id = g.film_id
+        WHERE g.genre = %s AND g.release_year = %s
+        ORDER BY fs.title ASC;
         """
 
     # Retrieves movies by production year.
     GET_MOVIES_BY_YEAR = """
         SELECT title, release_year
-        FROM film
+        FROM film_search
         WHERE release_year = %s
         ORDER BY title ASC;
         """
 
+    # Counts films per genre x year and per year in one round trip. Per-genre totals are
+    # summed from the genre x year cells; per-year totals come from film_search, so films
+    # with several genres are counted once.
+    GET_FACET_COUNTS = """
+        SELECT 'genre_year' AS facet, genre, release_year, COUNT(*) AS film_count
+        FROM film_search_genre
+        GROUP BY genre, release_year
+        UNION ALL
+        SELECT 'year' AS facet, NULL AS genre, release_year, COUNT(*) AS film_count
+        FROM film_search
+        GROUP BY release_year;
+        """
+
     # Retrieves the minimum and maximum release years from the film table.
     GET_YEAR_RANGE = """
         SELECT MIN(release_year) AS min_year, MAX(release_year) AS max_year
@@ -34,30 +119,65 @@ class RawQueries:
     # Retrieves movies by keyword in title or description (case-insensitive, excludes partial matches).
     GET_MOVIES_BY_KEYWORD = """
         SELECT title, release_year, description
-        FROM film
+        FROM film_search
         WHERE title REGEXP CONCAT('(^| )', %s, '.*( |$)')
         OR description REGEXP CONCAT('(^| )', %s, '.*( |$)')
         ORDER BY release_year DESC;
         """
 
-    # Retrieves movies by a single name (first or last).
-    GET_MOVIES_BY_ACTOR_SINGLE = """
-        SELECT f.title, f.release_year, a.first_name, a.last_name
-        FROM film AS f
-        JOIN film_actor AS fa ON f.film_id = fa.film_id
-        JOIN actor AS a ON fa.actor_id = a.actor_id
-        WHERE a.first_name LIKE %s OR a.last_name LIKE %s
-        ORDER BY f.release_year DESC;
+    # Retrieves movies by a single name (first or last) or a full name ("first last"):
+    # the name is matched on the small actor table, films are reached via film_search_actor.
+    GET_MOVIES_BY_ACTOR = """
+        SELECT fs.title, fs.release_year
+        FROM film_search AS fs
+        WHERE fs.film_id IN (
+            SELECT fa.film_id
+            FROM actor AS a
+            JOIN film_search_actor AS fa ON fa.actor_id = a.actor_id
+            WHERE CONCAT(a.first_name, ' ', a.last_name) LIKE %s
+        )
+        ORDER BY fs.release_year DESC;
         """
 
-    # Retrieves movies by full name (first AND last).
-    GET_MOVIES_BY_ACTOR_FULL = """
-        SELECT f.title, f.release_year, a.first_name, a.last_name
-        FROM film AS f
-        JOIN film_actor AS fa ON f.film_id = fa.film_id
-        JOIN actor AS a ON fa.actor_id = a.actor_id
-        WHERE a.first_name LIKE %s AND a.last_name LIKE %s
-        ORDER BY f.release_year DESC;
+    # Batch searches: {values} is replaced by RawQueries.values_table(n), a derived table
+    # with one row per searched value. Every result row is tagged with the value it matched.
+
+    # Retrieves movies for many keywords at once.
+    GET_MOVIES_BY_KEYWORDS = """
+        SELECT v.value AS matched, fs.title, fs.release_year, fs.description
+        FROM ({values}) AS v
+        JOIN film_search AS fs
+            ON fs.title REGEXP CONCAT('(^| )', v.value, '.*( |$)')
+            OR fs.description REGEXP CONCAT('(^| )', v.value, '.*( |$)')
+        ORDER BY v.value, fs.release_year DESC;
+        """
+
+    # Retrieves movies for many genres at once.
+    GET_MOVIES_BY_GENRES = """
+        SELECT v.value AS matched, fs.title, fs.release_year, g.genre
+        FROM ({values}) AS v
+        JOIN film_search_genre AS g ON g.genre = v.value
+        JOIN film_search AS fs ON fs.film_id = g.film_id
+        ORDER BY v.value, fs.release_year DESC;
+        """
+
+    # Retrieves movies for many production years at once.
+    GET_MOVIES_BY_YEARS = """
+        SELECT v.value AS matched, fs.title, fs.release_year
+        FROM ({values}) AS v
+        JOIN film_search AS fs ON fs.release_year = v.value
+        ORDER BY v.value, fs.title ASC;
+        """
+
+    # Retrieves movies for many actor names (single or "first last") at once.
+    GET_MOVIES_BY_ACTORS = """
+        SELECT v.value AS matched, fs.title, fs.release_year
+        FROM ({values}) AS v
+        JOIN actor AS a ON CONCAT(a.first_name, ' ', a.last_name) LIKE CONCAT('%%', v.value, '%%')
+        JOIN film_search_actor AS fa ON fa.actor_id = a.actor_id
+        JOIN film_search AS fs ON fs.film_id = fa.film_id
+        GROUP BY v.value, fs.film_id
+        ORDER BY v.value, fs.release_year DESC;
         """
 
     # Retrieves a list of actors whose first name or last name matches the search input.
@@ -67,68 +187,239 @@ class RawQueries:
         WHERE first_name LIKE %s OR last_name LIKE %s;
         """
 
-    # Retrieves the top N most searched queries from queries_log.
-    GET_TOP_QUERIES = """
-        SELECT query_type, 
-            CASE 
-                WHEN query_type = 'genre' THEN 'Genre: ' || genre
-                WHEN query_type = 'year' THEN 'Year: ' || production_year
-                WHEN query_type = 'keyword' THEN 'Keyword: ' || keyword
-                WHEN query_type = 'genre_year' THEN 'Genre: ' || genre || ', Year: ' || production_year
-                WHEN query_type = 'actor' THEN 'Actor: ' || keyword
-            END AS search_text,
-            COUNT(*) AS search_count
-        FROM queries_log
-        WHERE query_type IN ('genre', 'year', 'keyword', 'genre_year', 'actor') 
-        GROUP BY query_type, search_text
-        ORDER BY search_count DESC
+    # Retrieves the most searched raw values of one query type (input for batch searches).
+    # Events are counted per term on the (type_id, term_id) index before joining the terms.
+    GET_TOP_VALUES_BY_TYPE = """
+        SELECT st.{column} AS value, c.search_count
+        FROM (
+            SELECT term_id, COUNT(*) AS search_count
+            FROM search_events
+            WHERE type_id = (SELECT id FROM query_types WHERE name = ?)
+            GROUP BY term_id
+        ) AS c
+        JOIN search_terms AS st ON st.id = c.term_id
+        WHERE st.{column} IS NOT NULL
+        ORDER BY c.search_count DESC
         LIMIT ?;
         """
 
+    # Retrieves the top N most searched queries from the query log.
+    GET_TOP_QUERIES = """
+        SELECT qt.name AS query_type, st.search_text, c.search_count
+        FROM (
+            SELECT term_id, COUNT(*) AS search_count
+            FROM search_events
+            WHERE type_id IN (
+                SELECT id FROM query_types WHERE name IN ('genre', 'year', 'keyword', 'genre_year', 'actor')
+            )
+            GROUP BY term_id
+            ORDER BY search_count DESC
+            LIMIT ?
+        ) AS c
+        JOIN search_terms AS st ON st.id = c.term_id
+        JOIN query_types AS qt ON qt.id = st.type_id
+        ORDER BY c.search_count DESC;
+        """
+
     # Retrieves top queries filtered by type.
     GET_TOP_QUERIES_BY_TYPE = """
-            SELECT query_type, 
-                CASE 
-                    WHEN query_type = 'genre' THEN 'Genre: ' || genre
-                    WHEN query_type = 'year' THEN 'Year: ' || production_year
-                    WHEN query_type = 'keyword' THEN 'Keyword: ' || keyword
-                    WHEN query_type = 'genre_year' THEN 'Genre: ' || genre || ', Year: ' || production_year
-                    WHEN query_type = 'actor' THEN 'Actor: ' || keyword
-                END AS search_text,
-                COUNT(*) AS search_count
-            FROM queries_log
-            WHERE query_type = ?
-            GROUP BY query_type, search_text
+        SELECT qt.name AS query_type, st.search_text, c.search_count
+        FROM (
+            SELECT term_id, COUNT(*) AS search_count
+            FROM search_events
+            WHERE type_id = (SELECT id FROM query_types WHERE name = ?)
+            GROUP BY term_id
             ORDER BY search_count DESC
-            LIMIT ?;
-            """
+            LIMIT ?
+        ) AS c
+        JOIN search_terms AS st ON st.id = c.term_id
+        JOIN query_types AS qt ON qt.id = st.type_id
+        ORDER BY c.search_count DESC;
+        """
 
-    # Retrieves movie details (title, year, description, actors) by title (case-insensitive).
+    # Retrieves movie details (title, year, description, actors) by title (case-insensitive collation).
     GET_MOVIE_DETAILS = """
-        SELECT 
-            f.title AS title,
-            f.release_year AS year,
-            f.description AS description,
-            GROUP_CONCAT(DISTINCT CONCAT(a.first_name, ' ', a.last_name) SEPARATOR ', ') AS actors
+        SELECT title, release_year AS year, description, actors
+        FROM film_search
+        WHERE title = %s;
+        """
+
+    # Query for bubble chart (keyword frequency)
+    BUBBLE_CHART_QUERY = """
+        SELECT st.keyword, c.count
+        FROM (
+            SELECT term_id, COUNT(*) AS count
+            FROM search_events
+            WHERE type_id = (SELECT id FROM query_types WHERE name = 'keyword')
+            GROUP BY term_id
+            ORDER BY count DESC
+            LIMIT ?
+        ) AS c
+        JOIN search_terms AS st ON st.id = c.term_id
+        ORDER BY c.count DESC;
+        """
+
+    # Retrieves film titles and descriptions for building the trigram search index.
+    GET_FILM_SEARCH_TEXT = """
+        SELECT film_id, title, description
+        FROM film;
+        """
+
+    # Retrieves all actor full names for building the trigram search index.
+    GET_ALL_ACTORS = """
+        SELECT actor_id, CONCAT(first_name, ' ', last_name) AS full_name
+        FROM actor;
+        """
+
+    # Denormalized search projection: one row per film with everything the searches need.
+    CREATE_FILM_SEARCH = """
+        CREATE TABLE IF NOT EXISTS film_search (
+            film_id INT UNSIGNED NOT NULL PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            release_year YEAR,
+            actors TEXT,
+            source_updated TIMESTAMP NOT NULL,
+            KEY idx_film_search_title (title),
+            KEY idx_film_search_year_title (release_year, title)
+        );
+        """
+
+    # Genre membership of film_search: one row per film and genre (release_year is copied
+    # so genre and genre x year searches are index range scans).
+    CREATE_FILM_SEARCH_GENRE = """
+        CREATE TABLE IF NOT EXISTS film_search_genre (
+            genre VARCHAR(25) NOT NULL,
+            release_year YEAR,
+            film_id INT UNSIGNED NOT NULL,
+            PRIMARY KEY (genre, film_id),
+            KEY idx_film_search_genre_year (genre, release_year),
+            KEY idx_film_search_genre_film (film_id)
+        );
+        """
+
+    # Cast of film_search: one row per film and actor (actor searches join through it).
+    CREATE_FILM_SEARCH_ACTOR = """
+        CREATE TABLE IF NOT EXISTS film_search_actor (
+            actor_id SMALLINT UNSIGNED NOT NULL,
+            film_id INT UNSIGNED NOT NULL,
+            PRIMARY KEY (actor_id, film_id),
+            KEY idx_film_search_actor_film (film_id)
+        );
+        """
+
+    # Refresh bookkeeping of the projection (e.g. the start time of the last refresh).
+    CREATE_FILM_SEARCH_META = """
+        CREATE TABLE IF NOT EXISTS film_search_meta (
+            name VARCHAR(64) NOT NULL PRIMARY KEY,
+            value DATETIME NOT NULL
+        );
+        """
+
+    # Full rebuilds drop the projection first, which also upgrades an older table layout.
+    DROP_FILM_SEARCH = """
+        DROP TABLE IF EXISTS film_search, film_search_genre, film_search_actor, film_search_meta;
+        """
+
+    # Fails (1146) if a projection table is missing, e.g. never built by an account allowed to.
+    CHECK_FILM_SEARCH = """
+        SELECT 1
+        FROM film_search, film_search_genre, film_search_actor
+        LIMIT 0;
+        """
+
+    # Start time of the last successful refresh: everything changed before it is copied.
+    GET_FILM_SEARCH_WATERMARK = """
+        SELECT value AS watermark
+        FROM film_search_meta
+        WHERE name = %s;
+        """
+
+    # Current server time, read before a refresh starts (next refresh's watermark).
+    GET_SERVER_TIME = """
+        SELECT NOW() AS server_time;
+        """
+
+    SAVE_FILM_SEARCH_WATERMARK = """
+        REPLACE INTO film_search_meta (name, value)
+        VALUES (%s, %s);
+        """
+
+    # Films whose film, category or actor data changed at or after the watermark
+    # (the watermark is passed five times).
+    CHANGED_FILMS = """
+            SELECT film_id FROM film WHERE last_update >= %s
+            UNION SELECT film_id FROM film_category WHERE last_update >= %s
+            UNION SELECT fc2.film_id FROM film_category AS fc2
+                JOIN category AS c2 ON fc2.category_id = c2.category_id WHERE c2.last_update >= %s
+            UNION SELECT film_id FROM film_actor WHERE last_update >= %s
+            UNION SELECT fa2.film_id FROM film_actor AS fa2
+                JOIN actor AS a2 ON fa2.actor_id = a2.actor_id WHERE a2.last_update >= %s
+    """
+
+    # Rebuilds the film_search rows of every changed film.
+    REFRESH_FILM_SEARCH = f"""
+        REPLACE INTO film_search
+            (film_id, title, description, release_year, actors, source_updated)
+        SELECT
+            f.film_id,
+            f.title,
+            f.description,
+            f.release_year,
+            GROUP_CONCAT(DISTINCT CONCAT(a.first_name, ' ', a.last_name) SEPARATOR ', '),
+            GREATEST(
+                f.last_update,
+                COALESCE(MAX(fa.last_update), f.last_update),
+                COALESCE(MAX(a.last_update), f.last_update)
+            )
         FROM film AS f
         LEFT JOIN film_actor AS fa ON f.film_id = fa.film_id
         LEFT JOIN actor AS a ON fa.actor_id = a.actor_id
-        WHERE LOWER(f.title) = LOWER(%s)
-        GROUP BY f.film_id, f.title, f.release_year, f.description;
+        WHERE f.film_id IN ({CHANGED_FILMS})
+        GROUP BY f.film_id, f.title, f.description, f.release_year, f.last_update;
         """
 
-    # Query for visualisation pie chart
-    PIE_CHART_QUERY = """
-            SELECT query_type, COUNT(*) AS count
-            FROM queries_log
-            GROUP BY query_type;
+    # Genre rows of changed films are replaced: first removed, then copied again.
+    DELETE_CHANGED_FILM_SEARCH_GENRES = f"""
+        DELETE FROM film_search_genre
+        WHERE film_id IN ({CHANGED_FILMS});
         """
 
-    # Query for bubble chart (keyword frequency)
-    BUBBLE_CHART_QUERY = """
-        SELECT keyword, COUNT(*) AS count
-        FROM keywords_log
-        GROUP BY keyword
-        ORDER BY count DESC
-        LIMIT ?;
-        """
\ No newline at end of file
+    INSERT_CHANGED_FILM_SEARCH_GENRES = f"""
+        INSERT INTO film_search_genre (genre, release_year, film_id)
+        SELECT DISTINCT c.name, f.release_year, f.film_id
+        FROM film AS f
+        JOIN film_category AS fc ON f.film_id = fc.film_id
+        JOIN category AS c ON fc.category_id = c.category_id
+        WHERE f.film_id IN ({CHANGED_FILMS});
+        """
+
+    # Removes projection rows of films that no longer exist.
+    # Actor rows of changed films are replaced the same way.
+    DELETE_CHANGED_FILM_SEARCH_ACTORS = f"""
+        DELETE FROM film_search_actor
+        WHERE film_id IN ({CHANGED_FILMS});
+        """
+
+    INSERT_CHANGED_FILM_SEARCH_ACTORS = f"""
+        INSERT INTO film_search_actor (actor_id, film_id)
+        SELECT DISTINCT fa.actor_id, fa.film_id
+        FROM film_actor AS fa
+        JOIN film AS f ON f.film_id = fa.film_id
+        WHERE fa.film_id IN ({CHANGED_FILMS});
+        """
+
+    DELETE_STALE_FILM_SEARCH = """
+        DELETE FROM film_search
+        WHERE film_id NOT IN (SELECT film_id FROM film);
+        """
+
+    DELETE_STALE_FILM_SEARCH_GENRES = """
+        DELETE FROM film_search_genre
+        WHERE film_id NOT IN (SELECT film_id FROM film);
+        """
+
+    DELETE_STALE_FILM_SEARCH_ACTORS = """
+        DELETE FROM film_search_actor
+        WHERE film_id NOT IN (SELECT film_id FROM film);
+        """
@@ -0,0 +1,117 @@
+import itertools
+import time
+from pymysql import connect
+from pymysql.err import OperationalError, InterfaceError
+from config import REPLICA_STRATEGY, REPLICA_EJECT_SECONDS
+from db.result_set import ResultSet
+from db.circuit_breaker import SERVER_TIMEOUT_ERRORS, is_deadline_exceeded
+
+
+# A single read endpoint with its connection and health state.
+class ReplicaEndpoint:
+    def __init__(self, address: str, **kwargs):
+        host, _, port = address.partition(":")
+        self.address = address
+        self.config = {**kwargs, "host": host}
+        if port:
+            self.config["port"] = int(port)
+        self.connection = None
+        self.ejected_until = 0.0
+        self.latency = 0.0  # Moving average of query time in seconds
+
+    # An ejected endpoint is skipped until its ejection period is over.
+    def is_available(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    # True once the ejection period is over but the endpoint has not been probed yet.
+    def awaiting_probe(self) -> bool:
+        return self.ejected_until > 0 and self.is_available()
+
+    # Health check: (re)connects if needed and pings the server. A healthy endpoint is
+    # (re)admitted to the rotation, a failing one is ejected again.
+    def check(self) -> bool:
+        try:
+            if self.connection is None:
+                self.connection = connect(**self.config)
+            self.connection.ping(reconnect=True)
+        except (OperationalError, InterfaceError):
+            self.eject()
+            return False
+        self.ejected_until = 0.0
+        return True
+
+    # Takes the endpoint out of rotation for REPLICA_EJECT_SECONDS.
+    def eject(self):
+        self.ejected_until = time.monotonic() + REPLICA_EJECT_SECONDS
+        self.close()
+
+    def record_latency(self, seconds: float):
+        self.latency = seconds if not self.latency else 0.8 * self.latency + 0.2 * seconds
+
+    def close(self):
+        if self.connection:
+            try:
+                self.connection.close()
+            except (OperationalError, InterfaceError):
+                pass
+            self.connection = None
+
+
+# Spreads SELECT traffic across several read endpoints and fails over between them.
+class ReplicaRouter:
+    def __init__(self, read_hosts: list[str], strategy: str = REPLICA_STRATEGY, **kwargs):
+        kwargs.pop("host", None)
+        self.endpoints = [ReplicaEndpoint(address, **kwargs) for address in read_hosts]
+        self.strategy = strategy
+        self._round_robin = itertools.cycle(range(len(self.endpoints)))
+
+    # Returns available endpoints in the order they should be tried. Endpoints coming
+    # back from ejection are probed first and only re-admitted if they answer.
+    def _candidates(self) -> list[ReplicaEndpoint]:
+        self.health_check([endpoint for endpoint in self.endpoints if endpoint.awaiting_probe()])
+        available = [endpoint for endpoint in self.endpoints if endpoint.is_available()]
+        if self.strategy == "least_latency":
+            return sorted(available, key=lambda endpoint: endpoint.latency)
+        start = next(self._round_robin)
+        ordered = self.endpoints[start:] + self.endpoints[:start]
+        return [endpoint for endpoint in ordered if endpoint in available]
+
+    # Runs the query on the first healthy endpoint. Failed endpoints are ejected and
+    # the next one is tried, so the caller never sees a single replica going down.
+    # Returns None if every endpoint failed.
+    def execute(self, query: str, params: tuple = ()) -> ResultSet | None:
+        for endpoint in self._candidates():
+            if endpoint.connection is None and not endpoint.check():
+                continue
+            started = time.perf_counter()
+            try:
+                with endpoint.connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    columns = tuple(col[0] for col in cursor.description or ())
+                    result = ResultSet(columns, cursor.fetchall())
+            except (OperationalError, InterfaceError) as e:
+                # The statement ran out of time (server deadline or client read timeout):
+                # another replica would be just as slow, so let the caller handle it
+                # instead of multiplying the wait. A read timeout leaves the
+                # connection unusable, so it is reopened on the next query.
+                # Any other lost connection means the replica is down: try the next one.
+                if is_deadline_exceeded(e):
+                    if not (e.args and e.args[0] in SERVER_TIMEOUT_ERRORS):
+                        endpoint.close()
+                    raise
+                endpoint.eject()
+                continue
+            endpoint.record_latency(time.perf_counter() - started)
+            return result
+        return None
+
+    # Pings the given endpoints (default: all), ejecting those that do not answer.
+    # Returns {address: healthy}.
+    def health_check(self, endpoints: list[ReplicaEndpoint] = None) -> dict[str, bool]:
+        if endpoints is None:
+            endpoints = self.endpoints
+        return {endpoint.address: endpoint.check() for endpoint in endpoints}
+
+    def close(self):
+        for endpoint in self.endpoints:
+            endpoint.close()
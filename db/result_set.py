@@ -0,0 +1,109 @@
+from collections import namedtuple
+from functools import lru_cache
+
+
+# Builds (and caches) a tuple-based row type for a given column schema.
+# Rows stay plain tuples in memory, the column names live once on the class.
+# Columns that are not valid identifiers (e.g. COUNT(*)) get renamed attributes
+# (_0, _1, ...), but item access and get() always use the original column names.
+@lru_cache(maxsize=None)
+def row_type(columns: tuple):
+    base = namedtuple("Row", columns, rename=True)
+    positions = {name: idx for idx, name in enumerate(columns)}
+
+    class Row(base):
+        __slots__ = ()
+        _columns = columns
+
+        # Allows both positional and column-name access (row[0] / row["title"]).
+        def __getitem__(self, key):
+            if isinstance(key, str):
+                return tuple.__getitem__(self, positions[key])
+            return tuple.__getitem__(self, key)
+
+        # Mirrors dict.get for callers that expect optional columns. Only column names are
+        # looked up, so e.g. "count" or "index" never return the tuple methods.
+        def get(self, key, default=None):
+            idx = positions.get(key)
+            return default if idx is None else tuple.__getitem__(self, idx)
+
+        # Same as namedtuple._asdict, keyed by the original column names.
+        def _asdict(self):
+            return dict(zip(self._columns, self))
+
+    return Row
+
+
+# Compact container for query results: one shared column schema and tuple rows.
+class ResultSet:
+    __slots__ = ("columns", "rows", "partial", "_row_type")
+
+    def __init__(self, columns=(), rows=(), partial: bool = False):
+        self.columns = tuple(columns)
+        # True when rows may be missing: only the first page was fetched before a deadline,
+        # or nothing at all because the query failed.
+        self.partial = partial
+        self._row_type = row_type(self.columns) if self.columns else None
+        if self._row_type and rows and not isinstance(rows[0], self._row_type):
+            rows = [self._row_type._make(row) for row in rows]
+        self.rows = list(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    # Slicing returns a ResultSet that shares the same schema.
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResultSet(self.columns, self.rows[index], self.partial)
+        return self.rows[index]
+
+    def __repr__(self):
+        return f"ResultSet(columns={self.columns}, rows={len(self.rows)})"
+
+    # Returns the position of a column in each row.
+    def index_of(self, column: str) -> int:
+        return self.columns.index(column)
+
+    # Returns all values of a single column.
+    def column(self, column: str) -> list:
+        idx = self.index_of(column)
+        return [row[idx] for row in self.rows]
+
+    # Returns a new ResultSet containing only rows where column == value.
+    def where(self, column: str, value):
+        if not self.rows:
+            return ResultSet(self.columns, partial=self.partial)
+        idx = self.index_of(column)
+        return ResultSet(self.columns, [row for row in self.rows if row[idx] == value], self.partial)
+
+    # Splits rows by the value of one column: {value: ResultSet}, in first-seen order.
+    def group_by(self, column: str) -> dict:
+        groups = {}
+        if not self.rows:
+            return groups
+        idx = self.index_of(column)
+        for row in self.rows:
+            groups.setdefault(row[idx], []).append(row)
+        return {key: ResultSet(self.columns, rows, self.partial) for key, rows in groups.items()}
+
+    # Columnar form for large result sets: {column: tuple_of_values}.
+    def to_columns(self) -> dict:
+        if not self.rows:
+            return {name: () for name in self.columns}
+        return dict(zip(self.columns, zip(*self.rows)))
+
+    # Builds a ResultSet from a columnar dict produced by to_columns().
+    @classmethod
+    def from_columns(cls, columns: dict):
+        names = tuple(columns)
+        return cls(names, list(zip(*columns.values())))
+
+    # Converts rows to dicts (only for callers that really need them).
+    def to_dicts(self) -> list[dict]:
+        return [row._asdict() for row in self.rows]
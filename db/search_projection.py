@@ -0,0 +1,98 @@
+import argparse
+from pymysql.err import MySQLError
+from config import MYSQL_CONFIG
+from db.db_connector import DBConnection
+from db.raw_queries import RawQueries
+
+# Watermark used for the first (full) build of the projection.
+EPOCH = "1970-01-01 00:00:00"
+
+# Name of the refresh watermark in film_search_meta. It includes the table layout
+# version, so a layout change (e.g. a new child table) starts with a full build.
+WATERMARK_NAME = "refreshed_from_v2"
+
+
+# Maintains film_search (one row per film), film_search_genre (one row per film and
+# genre) and film_search_actor (one row per film and actor), the denormalized tables
+# read by all searches.
+class FilmSearchProjection:
+    def __init__(self, db: DBConnection):
+        self.db = db
+
+    # Creates the projection tables if they do not exist yet.
+    def ensure_table(self):
+        self.db.execute(RawQueries.CREATE_FILM_SEARCH)
+        self.db.execute(RawQueries.CREATE_FILM_SEARCH_GENRE)
+        self.db.execute(RawQueries.CREATE_FILM_SEARCH_ACTOR)
+        self.db.execute(RawQueries.CREATE_FILM_SEARCH_META)
+
+    # Returns True if the projection tables exist (searches cannot run without them).
+    def exists(self) -> bool:
+        try:
+            self.db.execute_select(RawQueries.CHECK_FILM_SEARCH)
+            return True
+        except MySQLError:
+            return False
+
+    # Returns the start time of the last successful refresh.
+    def get_watermark(self):
+        result = self.db.execute_select(RawQueries.GET_FILM_SEARCH_WATERMARK, (WATERMARK_NAME,))
+        return result[0].watermark if result and result[0].watermark else EPOCH
+
+    # Copies changes from film, film_category, category, film_actor and actor.
+    # Only rows changed since the start of the previous refresh are rebuilt (the
+    # comparison is >=, so changes made in that same second are not lost).
+    # Removed actor/category links do not touch last_update of the remaining rows,
+    # so use full=True after deleting such links.
+    # All row changes and the new watermark are committed in one transaction: other
+    # consoles never see a film without its genre/actor rows, and a concurrent refresh
+    # waits for the row locks instead of inserting the same child rows twice.
+    # Returns the number of changed projection rows, or None on failure.
+    def refresh(self, full: bool = False) -> int | None:
+        try:
+            if full:
+                self.db.execute(RawQueries.DROP_FILM_SEARCH)
+            self.ensure_table()  # DDL commits implicitly, so it runs before the transaction
+            watermark = EPOCH if full else self.get_watermark()
+            started = self.db.execute_select(RawQueries.GET_SERVER_TIME)
+            if not started:
+                print("Failed to refresh film_search: database not available.")
+                return None
+            params = (watermark,) * 5
+            try:
+                changed = self.db.execute(RawQueries.REFRESH_FILM_SEARCH, params, commit=False)
+                self.db.execute(RawQueries.DELETE_CHANGED_FILM_SEARCH_GENRES, params, commit=False)
+                self.db.execute(RawQueries.INSERT_CHANGED_FILM_SEARCH_GENRES, params, commit=False)
+                self.db.execute(RawQueries.DELETE_CHANGED_FILM_SEARCH_ACTORS, params, commit=False)
+                self.db.execute(RawQueries.INSERT_CHANGED_FILM_SEARCH_ACTORS, params, commit=False)
+                changed += self.db.execute(RawQueries.DELETE_STALE_FILM_SEARCH, commit=False)
+                self.db.execute(RawQueries.DELETE_STALE_FILM_SEARCH_GENRES, commit=False)
+                self.db.execute(RawQueries.DELETE_STALE_FILM_SEARCH_ACTORS, commit=False)
+                self.db.execute(RawQueries.SAVE_FILM_SEARCH_WATERMARK,
+                                (WATERMARK_NAME, started[0].server_time), commit=False)
+                self.db.commit()
+            except MySQLError:
+                self.db.rollback()
+                raise
+            return changed
+        except MySQLError as e:
+            print(f"Failed to refresh film_search: {e}")
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the film_search projection table.")
+    parser.add_argument("--full", action="store_true", help="Drop and rebuild the projection instead of only changed films.")
+    args = parser.parse_args()
+
+    db = DBConnection(**MYSQL_CONFIG)
+    try:
+        changed = FilmSearchProjection(db).refresh(full=args.full)
+        if changed is not None:
+            print(f"film_search refreshed: {changed} rows changed.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,24 @@
 import logging
+import sys
 import time
 from db.db_connector import DBConnection
 from db.query_logger import QueryLogger
+from db.search_projection import FilmSearchProjection
 from tasks.search_by_actor import SearchByActor
 from tasks.search_by_genre_year import SearchByGenreYear
 from tasks.search_by_keyword import SearchByKeyword
 from tasks.top_queries import TopQueries
-from tasks.visualisation import generate_pie_chart, generate_bar_chart, generate_bubble_chart
+from tasks.fuzzy_search import FuzzySearch
+from tasks.facets import FacetCounts
+from tasks.prefetcher import DetailsPrefetcher
+from tasks.profiler import SessionProfiler
+from tasks.session_recorder import SessionRecorder
+from tasks.visualisation import generate_pie_chart, generate_bar_chart, generate_bubble_chart, generate_time_histogram
 from tasks.utils import paginate_movies, display_movie_details, is_valid_year, get_year_range
-from config import MYSQL_CONFIG, PAGE_SIZE
+from config import (
+    MYSQL_CONFIG, READ_HOSTS, PAGE_SIZE, FILM_SEARCH_REFRESH_ON_START, PROFILING_ENABLED, RECORD_SESSIONS,
+    INCREMENTAL_SEARCH_ENABLED,
+)
 from prettytable import PrettyTable
 
 # Configure logger for console output
@@ -16,15 +26,54 @@ logging.basicConfig(format="%(message)s", level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize database connection
-db_mysql = DBConnection(**MYSQL_CONFIG)  # MySQL
+db_mysql = DBConnection(read_hosts=READ_HOSTS, **MYSQL_CONFIG)  # MySQL (primary + read replicas)
 db_sqlite = DBConnection(use_mysql=False) # SQLite
 logger_db = QueryLogger()
 
+# Bring the denormalized film_search tables up to date with the source tables
+projection = FilmSearchProjection(db_mysql)
+if FILM_SEARCH_REFRESH_ON_START:
+    projection.refresh()
+
+# All searches read the projection: without it (e.g. a read-only account that could not
+# create it) every search would fail, so stop here with instructions instead.
+if db_mysql.connection and not projection.exists():
+    logger.info("\n\033[91mThe film_search tables are missing. Build them once with an account that may "
+                "create tables: python -m db.search_projection --full\033[0m")
+    sys.exit(1)
+
 # Initialize search modules
-actor_search = SearchByActor(db_mysql)
+actor_search = SearchByActor(db_mysql, incremental=INCREMENTAL_SEARCH_ENABLED)
 genre_year_search = SearchByGenreYear(db_mysql)
-keyword_search = SearchByKeyword(db_mysql)
+keyword_search = SearchByKeyword(db_mysql, incremental=INCREMENTAL_SEARCH_ENABLED)
 top_queries = TopQueries(db_sqlite)
+fuzzy_search = FuzzySearch(db_mysql)
+facets = FacetCounts(db_mysql)
+prefetcher = DetailsPrefetcher()
+
+
+# Shows fuzzy "did you mean" suggestions and asks whether to use the best one.
+def offer_suggestion(query: str, suggestions: list) -> str | None:
+    best = FuzzySearch.did_you_mean(query, suggestions)
+    if not best:
+        return None
+
+    others = [term for term, _ in suggestions if term not in (best, query.lower())]
+    hint = f" (also: {', '.join(others)})" if others else ""
+    logger.info(f"\n\033[93mDid you mean '{best}'?{hint}\033[0m")
+
+    time.sleep(0.7)
+    choice = input(f"\nSearch for '{best}' instead? (y/n): ").strip().lower()
+    return best if choice == "y" else None
+
+
+# Tells the user the search failed (timeout, database not responding) when nothing
+# came back, instead of reporting that no movies match. Returns True if it did.
+def report_unavailable(results) -> bool:
+    if results is not None and not results and results.partial:
+        logger.info("\n\033[93mThe search is not available right now. Please try again shortly.\033[0m")
+        return True
+    return False
 
 
 # Handles searching for movies by actor.
@@ -39,10 +88,19 @@ def handle_actor_search():
             logger_db.log_query(keyword=actor_name, query_type="actor")
             matching_actors = actor_search.get_matching_actors(actor_name)
 
-            # If no matching actors are found, return to the menu
+            # If no matching actors are found, offer a fuzzy suggestion or return to the menu
+            if report_unavailable(matching_actors):
+                return
             if not matching_actors:
                 logger.info(f"\nNo actor {actor_name} found.")
-                return
+                suggestion = offer_suggestion(actor_name, fuzzy_search.suggest_actors(actor_name))
+                if not suggestion:
+                    return
+                # Suggestions can be full names, so resolve them through the index
+                matching_actors = fuzzy_search.actors_for(suggestion)
+                if not matching_actors:
+                    logger.info(f"\nNo actor {suggestion} found.")
+                    return
 
             # If only one match is found, select it automatically
             if len(matching_actors) == 1:
@@ -72,6 +130,8 @@ def handle_actor_search():
                 results = actor_search.search_by_actor(selected_actor)
 
                 # If no movies are found for the actor, return to the menu
+                if report_unavailable(results):
+                    return
                 if not results:
                     logger.info(f"\nNo movies found for actor: {selected_actor}")
                     return
@@ -91,9 +151,13 @@ def handle_genre_search():
 
     # Display available genres in a table
     genres = genre_year_search.get_all_genres()
-    table = PrettyTable(["#", "Genre"])
+    if not genres:
+        logger.info("\nGenres are not available right now. Returning to the main menu.")
+        return
+    table = PrettyTable(["#", "Genre", "Films"])
     for idx, genre in enumerate(genres, start=1):
-        table.add_row([idx, genre["genre"]])
+        count = facets.genre_count(genre["genre"])
+        table.add_row([idx, genre["genre"], "-" if count is None else count])
     logger.info("\033[97m\n" + str(table) + "\033[0m")
 
     attempts = 3
@@ -123,8 +187,15 @@ def handle_genre_search():
         # Log the selected genre
         logger_db.log_query(genre=genre, query_type="genre")
 
+        # The facet counts already tell whether the genre has any films
+        if facets.genre_count(genre) == 0:
+            logger.info(f"\nNo movies found for genre: {genre}")
+            return
+
         # Execute search
         results = genre_year_search.search_by_genre(genre)
+        if report_unavailable(results):
+            return
         if results:
             handle_paginated_movie_selection(results)
         else:
@@ -140,6 +211,17 @@ def handle_genre_search():
 def handle_year_search():
     attempts = 3
     year_range = get_year_range(db_mysql)
+    if year_range is None:
+        logger.info("\nThe year range is not available right now. Returning to the main menu.")
+        return
+
+    # Show how many films each year has (skipped while the facet counts are unavailable)
+    years = facets.years()
+    if years:
+        table = PrettyTable(["Year", "Films"])
+        for year, count in years:
+            table.add_row([year, count])
+        logger.info("\033[97m\n" + str(table) + "\033[0m")
 
     while attempts > 0:
         time.sleep(0.7)
@@ -153,7 +235,13 @@ def handle_year_search():
         year = int(year)
         logger_db.log_query(production_year=year, query_type="year")
 
+        if facets.year_count(year) == 0:
+            logger.info(f"\nNo movies found for year: {year}")
+            return
+
         results = genre_year_search.search_by_year(year)
+        if report_unavailable(results):
+            return
         if results:
             handle_paginated_movie_selection(results)
         else:
@@ -168,13 +256,20 @@ def handle_year_search():
 def handle_genre_year_search():
     # Retrieve the list of genres
     genres = genre_year_search.get_all_genres()
-    table = PrettyTable(["#", "Genre"])
+    if not genres:
+        logger.info("\nGenres are not available right now. Returning to the main menu.")
+        return
+    table = PrettyTable(["#", "Genre", "Films"])
     for idx, genre in enumerate(genres, start=1):
-        table.add_row([idx, genre["genre"]])
+        count = facets.genre_count(genre["genre"])
+        table.add_row([idx, genre["genre"], "-" if count is None else count])
     logger.info("\033[97m\n" + str(table) + "\033[0m")
 
     # Retrieve the dynamic year range from the database
     year_range = get_year_range(db_mysql)
+    if year_range is None:
+        logger.info("\nThe year range is not available right now. Returning to the main menu.")
+        return
 
     attempts = 3
     while attempts > 0:
@@ -200,6 +295,11 @@ def handle_genre_year_search():
                 attempts -= 1
                 continue
 
+        # Hint which years have films in the selected genre
+        genre_years = facets.years_for_genre(genre)
+        if genre_years:
+            logger.info(f"\n\033[92mYears with {genre} films: {', '.join(map(str, genre_years))}\033[0m")
+
         # User enters the production year
         year_attempts = 3
         while year_attempts > 0:
@@ -210,7 +310,14 @@ def handle_genre_year_search():
                 year = int(year)
                 logger_db.log_query(genre=genre, production_year=year, query_type="genre_year")
 
+                # Empty combinations are rejected from the facet counts without a query
+                if facets.genre_year_count(genre, year) == 0:
+                    logger.info(f"\nNo movies found for genre '{genre}' in year {year}.")
+                    return
+
                 results = genre_year_search.search_by_genre_and_year(genre, year)
+                if report_unavailable(results):
+                    return
                 if results:
                     handle_paginated_movie_selection(results)
                 else:
@@ -233,11 +340,20 @@ def handle_keyword_search():
 
         # Validate keyword: must be a single alphabetic word (no spaces, numbers, or symbols)
         if len(keyword) >= 3 and keyword.isalpha():
-            query_id = logger_db.log_query(keyword=keyword, query_type="keyword")
-            if query_id:
-                logger_db.log_keyword(query_id, keyword)
+            logger_db.log_query(keyword=keyword, query_type="keyword")
 
             results = keyword_search.search_by_keyword(keyword)
+            if report_unavailable(results):
+                return
+
+            # Nothing matched: the keyword may be misspelled, try the trigram index
+            if not results:
+                suggestion = offer_suggestion(keyword, fuzzy_search.suggest_keywords(keyword))
+                if suggestion:
+                    keyword = suggestion
+                    results = keyword_search.search_by_keyword(keyword)
+                    if report_unavailable(results):
+                        return
 
             if results:
                 handle_paginated_movie_selection(results)
@@ -254,6 +370,17 @@ def handle_keyword_search():
 
 # Handles user interaction for paginated movie selection.
 def handle_paginated_movie_selection(results):
+    if results.partial:
+        logger.info("\n\033[93mThe search took too long, showing the first matches only.\033[0m")
+    try:
+        browse_movie_pages(results)
+    finally:
+        # The user left the listing: drop pending detail lookups
+        prefetcher.cancel()
+
+
+# Shows result pages and movie details until the user leaves the listing.
+def browse_movie_pages(results):
     index = 0
 
     while True:
@@ -265,6 +392,9 @@ def handle_paginated_movie_selection(results):
 
         logger.info("\033[97m\n" + str(table) + "\033[0m")
 
+        # Load details of the visible films in the background while the user reads
+        prefetcher.prefetch(results[start_index - 1:end_index].column("title"))
+
         # Navigation options
         commands = [f"Enter movie number ({start_index}-{end_index}) to view details"]
         if has_previous:
@@ -294,7 +424,7 @@ def handle_paginated_movie_selection(results):
 
             elif choice.isdigit() and 1 <= int(choice) <= len(results):
                 title = results[int(choice) - 1]["title"]
-                display_movie_details(db_mysql, title)
+                display_movie_details(db_mysql, title, prefetcher.get(title))
 
                 # Adding a dialog for returning to the movie list or exiting.
                 back_attempts = 3
@@ -400,17 +530,18 @@ def handle_visualization_menu():
         table.add_row(["1", "Pie Chart (Query Types)"])
         table.add_row(["2", "Bar Chart (Top Queries)"])
         table.add_row(["3", "Bubble Chart (Keyword Frequency)"])
+        table.add_row(["4", "Histogram (Searches Over Time)"])
         table.add_row(["n", "Return to Main Menu"])
         logger.info("\033[97m\n" + str(table) + "\033[0m")
 
         time.sleep(0.7)
-        choice = input("\nEnter your choice (1-3): ").strip()
+        choice = input("\nEnter your choice (1-4): ").strip()
 
         if choice == "n":
             return
 
-        if not choice.isdigit() or not (1 <= int(choice) <= 3):
-            logger.info(f"\n\033[91mInvalid input. Please enter a number between 1 and 3.\033[0m")
+        if not choice.isdigit() or not (1 <= int(choice) <= 4):
+            logger.info(f"\n\033[91mInvalid input. Please enter a number between 1 and 4.\033[0m")
             attempts -= 1
             if attempts == 0:
                 logger.info("\nToo many invalid attempts. Returning to the main menu.")
@@ -422,6 +553,7 @@ def handle_visualization_menu():
             "1": generate_pie_chart,
             "2": generate_bar_chart,
             "3": generate_bubble_chart,
+            "4": generate_time_histogram,
         }
 
         logger.info("\n\033[92mGenerating visualization...\033[0m")
@@ -446,7 +578,26 @@ def handle_visualization_menu():
             return
 
 
+# Wraps every handle_* function, the imported task functions and the search objects
+# with the session profiler (opt-in via PROFILE=1).
+def enable_profiling() -> SessionProfiler:
+    profiler = SessionProfiler()
+    namespace = globals()
+    handlers = [name for name in namespace if name.startswith("handle_")]
+    task_functions = [
+        "paginate_movies", "display_movie_details", "get_year_range",
+        "generate_pie_chart", "generate_bar_chart", "generate_bubble_chart", "generate_time_histogram",
+    ]
+    task_objects = ["actor_search", "genre_year_search", "keyword_search", "top_queries", "fuzzy_search", "facets"]
+    profiler.instrument(namespace, handlers + task_functions, task_objects)
+    return profiler
+
+
 def main():
+    profiler = enable_profiling() if PROFILING_ENABLED else None
+    recorder = SessionRecorder() if RECORD_SESSIONS else None
+    if recorder:
+        recorder.install(globals())
     try:
         logger.info("\n\033[92mWelcome to CineScope!\033[0m")
         logger.info("\033[92mFind movies by actor, genre, year, or keyword.\033[0m")
@@ -484,8 +635,13 @@ def main():
             else:
                 logger.info("\n\033[91mInvalid choice. Please enter a number between 1 and 7, or 'n' to exit.\033[0m")
     finally:
+        prefetcher.close()
         db_mysql.close()
         db_sqlite.close()
+        if profiler:
+            logger.info(f"\nProfile report written to {profiler.close()}")
+        if recorder:
+            logger.info(f"\nSession recorded to {recorder.close()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+import time
+from db.db_connector import DBConnection
+from db.raw_queries import RawQueries
+from config import FACET_CACHE_TTL
+
+
+# Film counts per genre, per year and per genre x year, computed in one round trip
+# and cached, so menus can show counts and reject empty combinations
+# without running the search.
+class FacetCounts:
+    def __init__(self, db: DBConnection, ttl: float = FACET_CACHE_TTL):
+        self.db = db
+        self.ttl = ttl
+        self.by_genre = {}
+        self.by_year = {}
+        self.by_genre_year = {}
+        self.loaded_at = None
+
+    # Reloads all counts from the film_search projection. Only a complete result is
+    # cached: partial or failed loads leave no counts, so nothing is rejected on them.
+    def refresh(self):
+        by_genre, by_year, by_genre_year = {}, {}, {}
+        result = self.db.execute_select(RawQueries.GET_FACET_COUNTS)
+        if result.partial:
+            result = ()
+        for row in result:
+            if row.facet == "year":
+                by_year[row.release_year] = row.film_count
+                continue
+            genre = row.genre.lower()
+            by_genre[genre] = by_genre.get(genre, 0) + row.film_count
+            by_genre_year[(genre, row.release_year)] = row.film_count
+        self.by_genre, self.by_year, self.by_genre_year = by_genre, by_year, by_genre_year
+        self.loaded_at = time.monotonic() if by_genre_year else None  # Retry next time if nothing loaded
+
+    # Refreshes the cache when it was never loaded or is older than the TTL.
+    def ensure_fresh(self):
+        if self.loaded_at is None or time.monotonic() - self.loaded_at >= self.ttl:
+            self.refresh()
+
+    # The count getters return None when no complete counts could be loaded (e.g. MySQL
+    # is unavailable or the query timed out), so callers never reject a search on missing data.
+    def genre_count(self, genre: str) -> int | None:
+        self.ensure_fresh()
+        return self.by_genre.get(genre.lower(), 0) if self.by_genre_year else None
+
+    def year_count(self, year: int) -> int | None:
+        self.ensure_fresh()
+        return self.by_year.get(year, 0) if self.by_genre_year else None
+
+    def genre_year_count(self, genre: str, year: int) -> int | None:
+        self.ensure_fresh()
+        return self.by_genre_year.get((genre.lower(), year), 0) if self.by_genre_year else None
+
+    # Returns [(year, count)] of the years that have films, sorted by year.
+    def years(self) -> list[tuple]:
+        self.ensure_fresh()
+        return sorted(self.by_year.items(), key=lambda item: (item[0] is None, item[0]))
+
+    # Returns the years that have films in a genre, sorted.
+    def years_for_genre(self, genre: str) -> list[int]:
+        self.ensure_fresh()
+        genre = genre.lower()
+        return sorted(year for (g, year), count in self.by_genre_year.items() if g == genre and count and year is not None)
@@ -0,0 +1,135 @@
+import re
+from collections import defaultdict
+from db.db_connector import DBConnection
+from db.raw_queries import RawQueries
+from db.result_set import ResultSet
+from config import FUZZY_MIN_SIMILARITY, FUZZY_SUGGESTIONS_LIMIT
+
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+
+# Splits a term into padded trigrams (same scheme as PostgreSQL pg_trgm).
+def trigrams(term: str) -> set[str]:
+    padded = f"  {term.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# In-memory trigram index: maps each trigram to the terms that contain it.
+class TrigramIndex:
+    def __init__(self):
+        self.terms = []              # term_id -> term
+        self.term_ids = {}           # term -> term_id
+        self.term_grams = []         # term_id -> number of trigrams in the term
+        self.refs = []               # term_id -> set of referenced ids (films / actors)
+        self.postings = defaultdict(list)  # trigram -> list of term_ids
+
+    def __len__(self):
+        return len(self.terms)
+
+    # Adds a term to the index (duplicates only extend the reference set).
+    def add(self, term: str, ref=None):
+        term = term.lower()
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            grams = trigrams(term)
+            self.terms.append(term)
+            self.term_ids[term] = term_id
+            self.term_grams.append(len(grams))
+            self.refs.append(set())
+            for gram in grams:
+                self.postings[gram].append(term_id)
+        if ref is not None:
+            self.refs[term_id].add(ref)
+
+    # Returns (term, similarity) pairs ranked by trigram (Jaccard) similarity.
+    def lookup(self, query: str, limit: int = FUZZY_SUGGESTIONS_LIMIT,
+               min_similarity: float = FUZZY_MIN_SIMILARITY) -> list[tuple[str, float]]:
+        query_grams = trigrams(query)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for term_id in self.postings.get(gram, ()):
+                shared[term_id] += 1
+
+        scored = []
+        for term_id, common in shared.items():
+            similarity = common / (len(query_grams) + self.term_grams[term_id] - common)
+            if similarity >= min_similarity:
+                scored.append((similarity, term_id))
+
+        scored.sort(key=lambda item: (-item[0], self.terms[item[1]]))
+        return [(self.terms[term_id], round(similarity, 3)) for similarity, term_id in scored[:limit]]
+
+    # Returns the reference ids stored for an exact term.
+    def refs_for(self, term: str) -> set:
+        term_id = self.term_ids.get(term.lower())
+        return self.refs[term_id] if term_id is not None else set()
+
+
+# Typo-tolerant search over film titles, description words and actor names.
+class FuzzySearch:
+    def __init__(self, db: DBConnection):
+        self.db = db
+        self.titles = TrigramIndex()
+        self.words = TrigramIndex()
+        self.actors = TrigramIndex()
+        self.actor_names = {}  # actor_id -> full name
+        self.loaded = False
+
+    # Builds all indexes with two full reads; later lookups never touch MySQL.
+    # If either read fails, nothing is indexed and the next lookup tries again.
+    def build(self):
+        films = self.db.execute_select(RawQueries.GET_FILM_SEARCH_TEXT)
+        actors = self.db.execute_select(RawQueries.GET_ALL_ACTORS)
+        if films.partial or actors.partial:
+            return
+
+        for film in films:
+            self.titles.add(film.title, film.film_id)
+            text = f"{film.title} {film.description or ''}".lower()
+            for word in WORD_PATTERN.findall(text):
+                if len(word) >= 3:
+                    self.words.add(word, film.film_id)
+
+        for actor in actors:
+            self.actor_names[actor.actor_id] = actor.full_name
+            self.actors.add(actor.full_name, actor.actor_id)
+            for part in actor.full_name.split():
+                self.actors.add(part, actor.actor_id)
+
+        self.loaded = True
+
+    # Lazily builds the indexes on first use.
+    def ensure_loaded(self):
+        if not self.loaded:
+            self.build()
+
+    # Suggests keywords (title/description words) similar to the input.
+    def suggest_keywords(self, keyword: str) -> list[tuple[str, float]]:
+        self.ensure_loaded()
+        return self.words.lookup(keyword)
+
+    # Suggests film titles similar to the input.
+    def suggest_titles(self, title: str) -> list[tuple[str, float]]:
+        self.ensure_loaded()
+        return self.titles.lookup(title)
+
+    # Suggests actor names (full, first or last) similar to the input.
+    def suggest_actors(self, actor_name: str) -> list[tuple[str, float]]:
+        self.ensure_loaded()
+        return self.actors.lookup(actor_name)
+
+    # Resolves a suggested actor term (full, first or last name) to the actors it refers to,
+    # shaped like GET_MATCHING_ACTORS (full_name rows).
+    def actors_for(self, term: str) -> ResultSet:
+        self.ensure_loaded()
+        names = sorted(self.actor_names[actor_id] for actor_id in self.actors.refs_for(term))
+        return ResultSet(("full_name",), [(name,) for name in names])
+
+    # Returns the best "did you mean" candidate that differs from the input, or None.
+    @staticmethod
+    def did_you_mean(query: str, suggestions: list[tuple[str, float]]) -> str | None:
+        for term, _ in suggestions:
+            if term != query.lower():
+                return term
+        return None
@@ -0,0 +1,40 @@
+import time
+from db.result_set import ResultSet
+from config import INCREMENTAL_CACHE_TTL
+
+
+# Search-as-you-type helper: keeps the result set of the last database query and
+# answers longer queries (e.g. "pen" -> "penel") by filtering it locally.
+# The database is queried again only when the new text does not extend the cached
+# one, the cached set is truncated (partial results) or older than the TTL.
+class IncrementalSearch:
+    def __init__(self, fetch, matches, can_narrow, ttl: float = INCREMENTAL_CACHE_TTL):
+        self.fetch = fetch              # text -> ResultSet (database query)
+        self.matches = matches          # (row, text) -> bool, same predicate as the SQL
+        self.can_narrow = can_narrow    # (cached_text, text) -> bool
+        self.ttl = ttl
+        self.cached_text = None
+        self.cached = None
+        self.cached_at = 0.0
+        self.round_trips = 0
+
+    # Returns True if `text` can be answered from the cached superset.
+    def _can_use_cache(self, text: str) -> bool:
+        return (
+            self.cached is not None
+            and not self.cached.partial
+            and time.monotonic() - self.cached_at < self.ttl
+            and self.can_narrow(self.cached_text, text)
+        )
+
+    # Returns results for `text`, narrowing the cache locally when possible.
+    def search(self, text: str) -> ResultSet:
+        if self._can_use_cache(text):
+            if text == self.cached_text:
+                return self.cached
+            return ResultSet(self.cached.columns, [row for row in self.cached.rows if self.matches(row, text)])
+
+        result = self.fetch(text)
+        self.round_trips += 1
+        self.cached_text, self.cached, self.cached_at = text, result, time.monotonic()
+        return result
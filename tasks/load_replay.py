@@ -0,0 +1,160 @@
+import argparse
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tasks.session_recorder import load_session
+
+
+# Stands in for the `time` module inside main.py during a replay: the fixed UI
+# pauses (time.sleep(0.7)) are skipped, everything else is the real module.
+class ReplayClock:
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    @staticmethod
+    def sleep(seconds: float):
+        pass
+
+
+# Raised when the app asks a different question than the recording expects, i.e. the
+# replay went out of sync (e.g. different data changed the flow).
+class ReplayMismatch(Exception):
+    pass
+
+
+# Feeds recorded answers to main.py's prompts and measures how long the app took
+# between receiving an answer and asking the next question.
+class ReplayInput:
+    def __init__(self, events: list[dict], speed: float):
+        self.events = events
+        self.speed = speed
+        self.position = 0
+        self.answered_at = None
+        self.latencies = []
+
+    def __call__(self, prompt: str = "") -> str:
+        now = time.perf_counter()
+        if self.answered_at is not None:
+            self.latencies.append(now - self.answered_at)
+        if self.position >= len(self.events):
+            raise EOFError("Recorded session finished.")
+
+        event = self.events[self.position]
+        if prompt.strip() != event["prompt"]:
+            raise ReplayMismatch(
+                f"input #{self.position + 1}: expected prompt {event['prompt']!r}, got {prompt.strip()!r}"
+            )
+        self.position += 1
+        if self.speed > 0:
+            time.sleep(event["think"] / self.speed)
+        self.answered_at = time.perf_counter()
+        return event["input"]
+
+
+# Runs one recorded session against main.py in a fresh process and returns its stats.
+def replay_session(path: str, speed: float) -> dict:
+    os.environ["MPLBACKEND"] = "Agg"  # Charts must not open windows during a replay
+    logging.disable(logging.CRITICAL)
+
+    # Replays must not write to MySQL: skip the film_search refresh main.py runs on import.
+    # config may already be loaded in a forked worker, so patch the value too.
+    os.environ["FILM_SEARCH_REFRESH_ON_START"] = "0"
+    import config
+    config.FILM_SEARCH_REFRESH_ON_START = False
+
+    feeder = ReplayInput(load_session(path), speed)
+    # main.py exits at import when it cannot start (e.g. the projection is missing);
+    # SystemExit is not an Exception and would abort the whole load run in the parent.
+    try:
+        import main
+    except SystemExit as e:
+        return {"path": path, "duration": 0, "inputs": 0, "latencies": [],
+                "error": f"SystemExit: app failed to start (exit code {e.code})"}
+
+    main.input = feeder
+    main.time = ReplayClock()
+
+    started = time.perf_counter()
+    error = None
+    try:
+        main.main()
+    except EOFError:
+        pass
+    except SystemExit as e:
+        error = f"SystemExit: exit code {e.code}"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        "path": path,
+        "duration": time.perf_counter() - started,
+        "inputs": feeder.position,
+        "latencies": feeder.latencies,
+        "error": error,
+    }
+
+
+# Returns the p-th percentile (0-100) of a sorted list.
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, round(p / 100 * (len(values) - 1)))
+    return values[index]
+
+
+# Replays sessions concurrently (one process per session) and returns the summary.
+def run_load(paths: list[str], concurrency: int, speed: float, repeat: int = 1) -> dict:
+    jobs = paths * repeat
+    results = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=concurrency, max_tasks_per_child=1) as executor:
+        futures = [executor.submit(replay_session, path, speed) for path in jobs]
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"path": None, "duration": 0, "inputs": 0, "latencies": [],
+                                "error": f"{type(e).__name__}: {e}"})
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for result in results for latency in result["latencies"])
+    errors = [result for result in results if result["error"]]
+    inputs = sum(result["inputs"] for result in results)
+    return {
+        "sessions": len(results),
+        "elapsed_s": elapsed,
+        "sessions_per_s": len(results) / elapsed if elapsed else 0.0,
+        "inputs_per_s": inputs / elapsed if elapsed else 0.0,
+        "latency_ms": {p: percentile(latencies, p) * 1000 for p in (50, 90, 95, 99, 100)},
+        "error_rate": len(errors) / len(results) if results else 0.0,
+        "errors": [result["error"] for result in errors],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded console sessions concurrently as a load test.")
+    parser.add_argument("sessions", nargs="+", help="Recorded session files or glob patterns.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of sessions replayed at the same time.")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Think-time factor: 1 = real timing, 10 = ten times faster, 0 = no waiting.")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay every session this many times.")
+    args = parser.parse_args()
+
+    paths = sorted({path for pattern in args.sessions for path in glob.glob(pattern)})
+    if not paths:
+        print("No recorded sessions found.")
+        return
+
+    summary = run_load(paths, args.concurrency, args.speed, args.repeat)
+    print(f"Sessions:    {summary['sessions']} in {summary['elapsed_s']:.2f}s "
+          f"({summary['sessions_per_s']:.2f} sessions/s, {summary['inputs_per_s']:.2f} inputs/s)")
+    print("Latency ms:  " + ", ".join(f"p{p}={value:.1f}" for p, value in summary["latency_ms"].items()))
+    print(f"Error rate:  {summary['error_rate']:.1%}")
+    for error in summary["errors"][:10]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
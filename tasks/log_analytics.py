@@ -0,0 +1,290 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+import numpy as np
+from config import SQLITE_DB_PATH, SQLITE_BUSY_TIMEOUT, LOG_ANALYTICS_DIR, LOG_ANALYTICS_BATCH_SIZE
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Column files: name -> dtype.
+COLUMNS = {
+    "query_type": np.uint8,   # Code into meta["types"]
+    "value": np.uint32,       # Code into values.jsonl (line number)
+    "executed_at": np.int64,  # Epoch seconds (UTC)
+}
+
+
+# Columnar, memory-mapped snapshot of the search_events log for vectorized analytics.
+# query_type and the search text are dictionary-encoded; new log rows are
+# appended incrementally, so a refresh only reads rows added since the last one.
+# The value dictionary is an append-only file (values.jsonl, one [text, query_type]
+# per line); meta.json stays small and only counts rows and values.
+# Several console instances share the snapshot directory: refreshes hold an
+# exclusive file lock and pick up what another instance appended, re-reading
+# state only when meta.json changed.
+class QueryLogAnalytics:
+    def __init__(self, db_path: str = SQLITE_DB_PATH, data_dir: str = LOG_ANALYTICS_DIR):
+        self.db_path = db_path
+        self.data_dir = data_dir
+        self.meta_path = os.path.join(data_dir, "meta.json")
+        self.values_path = os.path.join(data_dir, "values.jsonl")
+        self.lock_path = os.path.join(data_dir, "snapshot.lock")
+        os.makedirs(data_dir, exist_ok=True)
+        self.meta_stamp = None
+        self._clear_state()
+        with self._lock():
+            self._reload()
+
+    def _column_path(self, column: str) -> str:
+        return os.path.join(self.data_dir, f"{column}.bin")
+
+    # Holds an exclusive lock on the snapshot directory (blocks while another instance refreshes).
+    @contextmanager
+    def _lock(self):
+        with open(self.lock_path, "a+b") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _clear_state(self):
+        self.meta = {"db_path": self.db_path, "last_id": 0, "rows": 0, "types": [], "values": 0}
+        self.values, self.value_types = [], []  # code -> search text / query type
+        self.values_offset = 0                  # Bytes of values.jsonl already read
+        self.type_codes, self.value_codes = {}, {}
+        self.arrays = {}
+
+    # Identifies the current meta.json (it is replaced atomically on every save).
+    def _stat_meta(self):
+        try:
+            stat = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    # Brings the in-memory state up to date with the files; call with the lock held.
+    # Nothing is read when meta.json is unchanged, and only new values.jsonl lines otherwise.
+    def _reload(self):
+        stamp = self._stat_meta()
+        if stamp is not None and stamp == self.meta_stamp:
+            return
+        try:
+            meta = self._load_meta()
+            if meta is None or meta["values"] < len(self.values):
+                self._reset()
+                return
+            self._read_values(meta["values"])
+        except (OSError, ValueError):
+            self._reset()  # Damaged snapshot: rebuild it
+            return
+        self.meta = meta
+        self.type_codes = {name: code for code, name in enumerate(meta["types"])}
+        self.arrays = {}
+        self.meta_stamp = stamp
+
+    # Returns the saved meta, or None if the snapshot has to be rebuilt.
+    def _load_meta(self) -> dict | None:
+        if not os.path.exists(self.meta_path):
+            return None
+        with open(self.meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        # A snapshot of another log file, or one whose files are shorter than meta.json
+        # says, is rebuilt. Rows appended after the last saved meta.json (an interrupted
+        # refresh) are cut off and read again.
+        sizes = {column: self._file_rows(column) for column in COLUMNS}
+        if (meta.get("db_path") != self.db_path or not isinstance(meta.get("values"), int)
+                or any(rows < meta["rows"] for rows in sizes.values())):
+            return None
+        for column, rows in sizes.items():
+            if rows > meta["rows"]:
+                os.truncate(self._column_path(column), meta["rows"] * np.dtype(COLUMNS[column]).itemsize)
+        return meta
+
+    # Reads values.jsonl up to `count` values, continuing after the lines already read.
+    def _read_values(self, count: int):
+        if len(self.values) < count:
+            with open(self.values_path, "rb") as f:
+                f.seek(self.values_offset)
+                while len(self.values) < count:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        raise ValueError("values.jsonl is shorter than meta.json")
+                    text, query_type = json.loads(line)
+                    self.value_codes[text] = len(self.values)
+                    self.values.append(text)
+                    self.value_types.append(query_type)
+                    self.values_offset += len(line)
+        if os.path.exists(self.values_path) and os.path.getsize(self.values_path) > self.values_offset:
+            os.truncate(self.values_path, self.values_offset)  # Values of an interrupted refresh
+
+    def _file_rows(self, column: str) -> int:
+        path = self._column_path(column)
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // np.dtype(COLUMNS[column]).itemsize
+
+    # Empties the snapshot on disk and in memory.
+    def _reset(self):
+        for path in [self._column_path(column) for column in COLUMNS] + [self.values_path]:
+            open(path, "wb").close()
+        self._clear_state()
+        self._save_meta()
+
+    def _save_meta(self):
+        self.meta["values"] = len(self.values)
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.meta_path)
+        self.meta_stamp = self._stat_meta()
+
+    # Appends log rows added since the last refresh. Returns the number of new rows.
+    # meta.json is written once at the end, not after every batch.
+    def refresh(self) -> int:
+        with self._lock():
+            self._reload()  # Another instance may have appended rows since
+            added = 0
+            try:
+                added = self._read_new_rows()
+            finally:
+                if added:
+                    self._save_meta()
+        self.arrays = {}
+        return added
+
+    def _read_new_rows(self) -> int:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT)
+        except sqlite3.Error as e:
+            print(f"SQLite error: {e}")
+            return 0
+
+        added = 0
+        try:
+            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM search_events;").fetchone()[0]
+            if max_id < self.meta["last_id"]:
+                self._reset()  # The log was recreated: start the snapshot over
+
+            cursor = conn.execute("""
+                SELECT e.id, qt.name, st.search_text, e.executed_at
+                FROM search_events AS e
+                JOIN search_terms AS st ON st.id = e.term_id
+                JOIN query_types AS qt ON qt.id = e.type_id
+                WHERE e.id > ?
+                ORDER BY e.id;
+                """, (self.meta["last_id"],))
+            while True:
+                rows = cursor.fetchmany(LOG_ANALYTICS_BATCH_SIZE)
+                if not rows:
+                    break
+                self._append(rows)
+                added += len(rows)
+        except sqlite3.Error as e:
+            print(f"SQLite error: {e}")
+        finally:
+            conn.close()
+        return added
+
+    def _append(self, rows: list[tuple]):
+        types = self.meta["types"]
+        type_codes = np.empty(len(rows), dtype=COLUMNS["query_type"])
+        value_codes = np.empty(len(rows), dtype=COLUMNS["value"])
+        new_values = []
+        for i, (_, query_type, text, _) in enumerate(rows):
+            code = self.type_codes.get(query_type)
+            if code is None:
+                code = self.type_codes[query_type] = len(types)
+                types.append(query_type)
+            type_codes[i] = code
+            code = self.value_codes.get(text)
+            if code is None:
+                code = self.value_codes[text] = len(self.values)
+                self.values.append(text)
+                self.value_types.append(query_type)  # Each search text belongs to one type
+                new_values.append(json.dumps([text, query_type]) + "\n")
+            value_codes[i] = code
+        timestamps = np.fromiter((row[3] for row in rows), dtype=COLUMNS["executed_at"], count=len(rows))
+
+        if new_values:
+            with open(self.values_path, "ab") as f:
+                data = "".join(new_values).encode("utf-8")
+                f.write(data)
+                self.values_offset += len(data)
+        for column, data in (("query_type", type_codes), ("value", value_codes), ("executed_at", timestamps)):
+            with open(self._column_path(column), "ab") as f:
+                data.tofile(f)
+
+        self.meta["last_id"] = rows[-1][0]
+        self.meta["rows"] += len(rows)
+
+    # Returns a read-only memory-mapped column.
+    def column(self, column: str) -> np.ndarray:
+        if column not in self.arrays:
+            rows = self.meta["rows"]
+            if rows == 0:
+                self.arrays[column] = np.empty(0, dtype=COLUMNS[column])
+            else:
+                self.arrays[column] = np.memmap(self._column_path(column), dtype=COLUMNS[column],
+                                                mode="r", shape=(rows,))
+        return self.arrays[column]
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    # Most searched values, optionally for one query type.
+    # Returns rows shaped like GET_TOP_QUERIES: (query_type, search_text, search_count).
+    def top_queries(self, limit: int, query_type: str = None) -> list[tuple]:
+        values = self.column("value")
+        types = self.column("query_type")
+        if query_type is not None:
+            code = self.type_codes.get(query_type)
+            if code is None:
+                return []
+            values = values[types == code]
+
+        counts = np.bincount(values, minlength=len(self.values))
+        top = np.argsort(counts, kind="stable")[::-1][:limit]
+        top = top[counts[top] > 0]
+        return [(self.value_types[code], self.values[code], int(counts[code])) for code in top]
+
+    # Number of searches per query type: [(query_type, count)].
+    def type_distribution(self) -> list[tuple]:
+        counts = np.bincount(self.column("query_type"), minlength=len(self.meta["types"]))
+        return [(name, int(count)) for name, count in zip(self.meta["types"], counts) if count]
+
+    # Number of searches per time bucket (seconds, default one day): (bucket_starts, counts).
+    def time_histogram(self, bucket_seconds: int = 86400) -> tuple[np.ndarray, np.ndarray]:
+        timestamps = self.column("executed_at")
+        if not len(timestamps):
+            return np.empty(0, dtype="datetime64[s]"), np.empty(0, dtype=np.int64)
+        buckets = timestamps // bucket_seconds
+        start = buckets.min()
+        counts = np.bincount(buckets - start)
+        starts = ((np.arange(len(counts)) + start) * bucket_seconds).astype("datetime64[s]")
+        return starts, counts
+
+
+# Shared snapshot of the local query log, refreshed before each use.
+_analytics = None
+
+
+def get_log_analytics() -> QueryLogAnalytics:
+    global _analytics
+    if _analytics is None:
+        _analytics = QueryLogAnalytics()
+    _analytics.refresh()
+    return _analytics
@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from db.db_connector import DBConnection
+from db.raw_queries import RawQueries
+from config import MYSQL_CONFIG, READ_HOSTS, PREFETCH_WORKERS
+
+
+# Loads movie details in the background while the user reads a page of results.
+# PyMySQL connections are not thread-safe, so every worker thread opens its own.
+class DetailsPrefetcher:
+    def __init__(self, max_workers: int = PREFETCH_WORKERS, **db_config):
+        self.db_config = db_config or MYSQL_CONFIG
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        self.futures = {}  # title -> Future
+
+    # Returns the worker thread's own MySQL connection.
+    def _get_db(self) -> DBConnection:
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = DBConnection(read_hosts=READ_HOSTS, **self.db_config)
+            self.local.db = db
+            with self.lock:
+                self.connections.append(db)
+        return db
+
+    def _fetch_details(self, title: str):
+        result = self._get_db().execute_select(RawQueries.GET_MOVIE_DETAILS, (title,))
+        return result[0] if result else None
+
+    # Schedules detail lookups for the given titles (already scheduled ones are skipped).
+    # Queued lookups of titles no longer on the page are cancelled, so a new page never
+    # waits behind the previous one.
+    def prefetch(self, titles: list[str]):
+        wanted = set(titles)
+        with self.lock:
+            for title, future in list(self.futures.items()):
+                if title not in wanted and future.cancel():
+                    del self.futures[title]
+            for title in titles:
+                if title not in self.futures:
+                    self.futures[title] = self.executor.submit(self._fetch_details, title)
+
+    # Returns prefetched details, waiting only for a lookup that is already running.
+    # Returns None if the title was never scheduled, is still queued (it is cancelled,
+    # a direct query is faster than waiting for the lookups ahead of it) or failed.
+    def get(self, title: str):
+        with self.lock:
+            future = self.futures.get(title)
+            if future is not None and future.cancel():
+                del self.futures[title]
+                return None
+        if future is None or future.cancelled():
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    # Cancels pending lookups and drops cached results (user left the listing).
+    def cancel(self):
+        with self.lock:
+            for future in self.futures.values():
+                future.cancel()
+            self.futures.clear()
+
+    # Stops the workers and closes their connections.
+    def close(self):
+        self.cancel()
+        self.executor.shutdown(wait=True)
+        for db in self.connections:
+            db.close()
@@ -0,0 +1,160 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from datetime import datetime
+from config import PROFILE_REPORT_DIR, PROFILE_TOP_FUNCTIONS
+
+
+# Aggregated measurements of one profiled function over a session.
+class ProfileEntry:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall_time = 0.0
+        self.max_wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_memory = 0
+        self.net_memory = 0
+        self.stats = None            # pstats.Stats, only for outermost (handler) calls
+        self.top_allocations = []    # tracemalloc diff of the call with the highest peak
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "wall_time_s": round(self.wall_time, 6),
+            "max_wall_time_s": round(self.max_wall_time, 6),
+            "cpu_time_s": round(self.cpu_time, 6),
+            "peak_memory_kb": round(self.peak_memory / 1024, 1),
+            "net_memory_kb": round(self.net_memory / 1024, 1),
+            "top_allocations": self.top_allocations,
+        }
+
+
+# Opt-in per-handler profiler: wall time, CPU time, tracemalloc peak/net memory and
+# cProfile stats. Nested calls (tasks called from a handler) get time and memory;
+# cProfile and tracemalloc snapshots run for the outermost call only.
+class SessionProfiler:
+    def __init__(self, report_dir: str = PROFILE_REPORT_DIR):
+        self.report_dir = report_dir
+        self.entries = {}
+        self.stack = []  # Highest traced memory seen by each active call (see _measure)
+        self.started_at = datetime.now()
+        tracemalloc.start()
+
+    # Returns a wrapper that measures every call of `func` under `name`.
+    def wrap(self, func, name: str = None):
+        name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self._measure(name, func, args, kwargs)
+
+        wrapper.__profiled__ = True
+        return wrapper
+
+    def _measure(self, name, func, args, kwargs):
+        outermost = not self.stack
+        current, peak_so_far = tracemalloc.get_traced_memory()
+        if self.stack:
+            self.stack[-1] = max(self.stack[-1], peak_so_far)
+        self.stack.append(0)
+        tracemalloc.reset_peak()
+
+        profile = cProfile.Profile() if outermost else None
+        snapshot = tracemalloc.take_snapshot() if outermost else None
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profile:
+            profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profile:
+                profile.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            end_current, peak = tracemalloc.get_traced_memory()
+
+            # reset_peak() hides peaks from before nested calls, so each call carries
+            # the highest peak seen so far and hands it on to its enclosing call.
+            peak = max(peak, self.stack.pop())
+            if self.stack:
+                self.stack[-1] = max(self.stack[-1], peak)
+
+            entry = self.entries.setdefault(name, ProfileEntry(name))
+            entry.calls += 1
+            entry.wall_time += wall
+            entry.max_wall_time = max(entry.max_wall_time, wall)
+            entry.cpu_time += cpu
+            entry.net_memory += end_current - current
+            if peak - current >= entry.peak_memory and snapshot:
+                entry.top_allocations = self._top_allocations(snapshot)
+            entry.peak_memory = max(entry.peak_memory, peak - current)
+            if profile:
+                if entry.stats is None:
+                    entry.stats = pstats.Stats(profile)
+                else:
+                    entry.stats.add(profile)
+
+    # Top allocation sites of a call, leaving out the profiler's own bookkeeping.
+    @staticmethod
+    def _top_allocations(before) -> list[str]:
+        filters = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+        diff = after.compare_to(before.filter_traces(filters), "lineno")
+        return [str(stat) for stat in diff[:5]]
+
+    # Replaces handle_* functions and instance methods of the given objects in a namespace.
+    def instrument(self, namespace: dict, functions: list[str], objects: list[str] = ()):
+        for name in functions:
+            func = namespace[name]
+            if not getattr(func, "__profiled__", False):
+                namespace[name] = self.wrap(func, name)
+        for obj_name in objects:
+            obj = namespace[obj_name]
+            for attr in dir(obj):
+                method = getattr(obj, attr)
+                if attr.startswith("_") or not callable(method) or getattr(method, "__profiled__", False):
+                    continue
+                setattr(obj, attr, self.wrap(method, f"{type(obj).__name__}.{attr}"))
+
+    # Writes the session report (text + JSON, sorted by wall time) and returns the text path.
+    def write_report(self) -> str:
+        os.makedirs(self.report_dir, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(self.report_dir, f"profile_{stamp}")
+        entries = sorted(self.entries.values(), key=lambda entry: entry.wall_time, reverse=True)
+
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump({entry.name: entry.to_dict() for entry in entries}, f, indent=2)
+
+        lines = [f"CineScope profile report ({self.started_at:%Y-%m-%d %H:%M:%S})", ""]
+        lines.append(f"{'Function':45} {'Calls':>6} {'Wall s':>9} {'Max s':>9} {'CPU s':>9} {'Peak KB':>10} {'Net KB':>10}")
+        for entry in entries:
+            data = entry.to_dict()
+            lines.append(
+                f"{entry.name[:45]:45} {data['calls']:>6} {data['wall_time_s']:>9.3f} {data['max_wall_time_s']:>9.3f} "
+                f"{data['cpu_time_s']:>9.3f} {data['peak_memory_kb']:>10.1f} {data['net_memory_kb']:>10.1f}"
+            )
+
+        for entry in entries:
+            if entry.stats is None:
+                continue
+            stream = io.StringIO()
+            entry.stats.stream = stream
+            entry.stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+            lines += ["", f"=== {entry.name} ===", *entry.top_allocations, stream.getvalue()]
+
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        return f"{base}.txt"
+
+    # Stops tracing and writes the report.
+    def close(self) -> str:
+        path = self.write_report()
+        tracemalloc.stop()
+        return path
@@ -1,33 +1,53 @@
 from db.db_connector import DBConnection
 from db.raw_queries import RawQueries
+from tasks.utils import run_batch_search
+from tasks.incremental_search import IncrementalSearch
 
 # Handles search for movies by actor.
 class SearchByActor:
-    def __init__(self, db: DBConnection):
+    # With incremental=True, actor lookups reuse the previous result set when the new
+    # input contains the previous one (see IncrementalSearch).
+    def __init__(self, db: DBConnection, incremental: bool = False):
         self.db = db
+        self.incremental = IncrementalSearch(
+            fetch=self._fetch_matching_actors,
+            matches=self._actor_matches,
+            can_narrow=lambda cached, text: cached.lower() in text.lower(),
+        ) if incremental else None
 
     # Searches for movies by actor (first name, last name, or both).
     def search_by_actor(self, actor_name: str):
         name_parts = actor_name.split()
 
-        if len(name_parts) == 1:
-            query = RawQueries.GET_MOVIES_BY_ACTOR_SINGLE
-            params = (f"%{name_parts[0]}%", f"%{name_parts[0]}%")
-        elif len(name_parts) == 2:
-            query = RawQueries.GET_MOVIES_BY_ACTOR_FULL
-            params = (f"%{name_parts[0]}%", f"%{name_parts[1]}%")
-        else:
+        if not 1 <= len(name_parts) <= 2:
             return None  # Invalid input case is handled in `main.py`
 
-        result = self.db.execute_select(query, params)
+        params = (f"%{' '.join(name_parts)}%",)
+        result = self.db.execute_select(RawQueries.GET_MOVIES_BY_ACTOR, params)
         return result
 
+    # Searches for movies by many actor names in one query; returns {name: ResultSet}.
+    # Names with more than two parts are skipped, as in search_by_actor.
+    def search_by_actors(self, actor_names: list[str]) -> dict:
+        names = [" ".join(name.split()) for name in actor_names if 1 <= len(name.split()) <= 2]
+        return run_batch_search(self.db, RawQueries.GET_MOVIES_BY_ACTORS, names)
+
 
     # Retrieves a list of actors matching the input.
     def get_matching_actors(self, actor_name: str):
+        if self.incremental:
+            return self.incremental.search(actor_name)
+        return self._fetch_matching_actors(actor_name)
+
+    def _fetch_matching_actors(self, actor_name: str):
         query = RawQueries.GET_MATCHING_ACTORS
         params = (f"%{actor_name}%", f"%{actor_name}%")
         result = self.db.execute_select(query, params)
         return result
 
-
+    # Local version of GET_MATCHING_ACTORS: first or last name contains the input.
+    @staticmethod
+    def _actor_matches(row, actor_name: str) -> bool:
+        first_name, _, last_name = row["full_name"].lower().partition(" ")
+        actor_name = actor_name.lower()
+        return actor_name in first_name or actor_name in last_name
@@ -1,5 +1,7 @@
 from db.db_connector import DBConnection
 from db.raw_queries import RawQueries
+from db.result_set import ResultSet
+from tasks.utils import run_batch_search
 
 # Handles search by genre, year, and their combination.
 class SearchByGenreYear:
@@ -22,7 +24,14 @@ class SearchByGenreYear:
         return result
 
     # Searches for movies by genre and production year.
-    def search_by_genre_and_year(self, genre: str, year: int) -> list[dict] | None:
-        results = self.db.execute_select(RawQueries.GET_MOVIES_BY_GENRE, (genre,))
-        filtered_results = [movie for movie in results if movie['release_year'] == year]
-        return filtered_results
\ No newline at end of file
+    def search_by_genre_and_year(self, genre: str, year: int) -> ResultSet:
+        result = self.db.execute_select(RawQueries.GET_MOVIES_BY_GENRE_YEAR, (genre, year))
+        return result
+
+    # Searches for movies by many genres in one query; returns {genre: ResultSet}.
+    def search_by_genres(self, genres: list[str]) -> dict:
+        return run_batch_search(self.db, RawQueries.GET_MOVIES_BY_GENRES, genres)
+
+    # Searches for movies by many production years in one query; returns {year: ResultSet}.
+    def search_by_years(self, years: list[int]) -> dict:
+        return run_batch_search(self.db, RawQueries.GET_MOVIES_BY_YEARS, [int(year) for year in years])
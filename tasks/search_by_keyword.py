@@ -1,12 +1,37 @@
+import re
 from db.db_connector import DBConnection
 from db.raw_queries import RawQueries
+from tasks.utils import run_batch_search
+from tasks.incremental_search import IncrementalSearch
 
 # Handles search by keyword in title or description.
 class SearchByKeyword:
-    def __init__(self, db: DBConnection):
+    # With incremental=True, a keyword that extends the previous one ("dra" -> "drama")
+    # is answered by filtering the previous result set (see IncrementalSearch).
+    def __init__(self, db: DBConnection, incremental: bool = False):
         self.db = db
+        self.incremental = IncrementalSearch(
+            fetch=self._fetch_by_keyword,
+            matches=self._keyword_matches,
+            can_narrow=lambda cached, text: text.lower().startswith(cached.lower()),
+        ) if incremental else None
 
     # Searches for movies by keyword in title or description.
     def search_by_keyword(self, keyword: str):
+        if self.incremental:
+            return self.incremental.search(keyword)
+        return self._fetch_by_keyword(keyword)
+
+    def _fetch_by_keyword(self, keyword: str):
         result = self.db.execute_select(RawQueries.GET_MOVIES_BY_KEYWORD, (keyword, keyword))
-        return result
\ No newline at end of file
+        return result
+
+    # Local version of GET_MOVIES_BY_KEYWORD: a word in the title or description starts with the keyword.
+    @staticmethod
+    def _keyword_matches(row, keyword: str) -> bool:
+        pattern = re.compile(rf"(^| ){re.escape(keyword)}", re.IGNORECASE)
+        return bool(pattern.search(row["title"]) or pattern.search(row["description"] or ""))
+
+    # Searches for movies by many keywords in one query; returns {keyword: ResultSet}.
+    def search_by_keywords(self, keywords: list[str]) -> dict:
+        return run_batch_search(self.db, RawQueries.GET_MOVIES_BY_KEYWORDS, keywords)
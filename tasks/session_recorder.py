@@ -0,0 +1,48 @@
+import builtins
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from config import SESSION_RECORD_DIR
+
+
+# Records every prompt answered in a console session (opt-in via RECORD_SESSIONS=1).
+# Each line of the session file is one input: the prompt, the answer and the
+# user's think time (seconds between the prompt appearing and the answer).
+class SessionRecorder:
+    def __init__(self, record_dir: str = SESSION_RECORD_DIR):
+        os.makedirs(record_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(record_dir, f"session_{stamp}_{uuid.uuid4().hex[:8]}.jsonl")
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.started = time.monotonic()
+
+    # Replaces `input` in the given module namespace with a recording version.
+    def install(self, namespace: dict):
+        original = namespace.get("input", builtins.input)
+
+        def recording_input(prompt: str = "") -> str:
+            asked = time.monotonic()
+            answer = original(prompt)
+            answered = time.monotonic()
+            self.file.write(json.dumps({
+                "at": round(asked - self.started, 3),
+                "think": round(answered - asked, 3),
+                "prompt": prompt.strip(),
+                "input": answer,
+            }) + "\n")
+            self.file.flush()
+            return answer
+
+        namespace["input"] = recording_input
+
+    def close(self) -> str:
+        self.file.close()
+        return self.path
+
+
+# Reads a recorded session file into a list of input events.
+def load_session(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -5,6 +5,14 @@ from config import TOP_QUERIES_LIMIT
 
 # Handles retrieval and display of top search queries.
 class TopQueries:
+    # search_terms column holding the searched value of each query type.
+    VALUE_COLUMNS = {
+        "genre": "genre",
+        "year": "production_year",
+        "keyword": "keyword",
+        "actor": "keyword",
+    }
+
     def __init__(self, db: DBConnection):
         self.db = db
 
@@ -16,4 +24,17 @@ class TopQueries:
     # Fetches top queries filtered by type from SQLite.
     def get_top_queries_by_type(self, query_type: str):
         result = self.db.execute_sqlite_select(RawQueries.GET_TOP_QUERIES_BY_TYPE, (query_type, TOP_QUERIES_LIMIT))
-        return result
\ No newline at end of file
+        return result
+
+    # Retrieves the most searched raw values of one type, e.g. to feed the batch searches.
+    # genre_year searches have two values and no batch search, so they are rejected.
+    def get_top_values(self, query_type: str, limit: int = TOP_QUERIES_LIMIT) -> list:
+        column = self.VALUE_COLUMNS.get(query_type)
+        if column is None:
+            raise ValueError(
+                f"No single search value for query type '{query_type}' "
+                f"(expected one of: {', '.join(self.VALUE_COLUMNS)})."
+            )
+        query = RawQueries.GET_TOP_VALUES_BY_TYPE.format(column=column)
+        result = self.db.execute_sqlite_select(query, (query_type, limit))
+        return [row[0] for row in result]
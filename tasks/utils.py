@@ -1,7 +1,8 @@
 import logging
 from db.db_connector import DBConnection
 from db.raw_queries import RawQueries
-from config import PAGE_SIZE
+from db.result_set import ResultSet
+from config import PAGE_SIZE, BATCH_SEARCH_MAX_VALUES
 from prettytable import PrettyTable
 
 # Configure logger for console output.
@@ -9,41 +10,73 @@ logging.basicConfig(format="%(message)s", level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Formats movies into a PrettyTable and returns it.
-def paginate_movies(movies: list, index: int = 0):
+def paginate_movies(movies: ResultSet, index: int = 0):
     if not movies:
-        return None, None, None
+        return None, None, None, None, None
 
-    page = movies[index:index + PAGE_SIZE]
+    page = movies.rows[index:index + PAGE_SIZE]
     start_index = index + 1
     end_index = min(index + PAGE_SIZE, len(movies))
 
+    # Resolve column positions once per page instead of a key lookup per row.
+    title_idx = movies.index_of("title")
+    year_idx = movies.index_of("release_year")
+
     table = PrettyTable(["#", "Title", "Year"])
     for i, movie in enumerate(page, start=start_index):
-        table.add_row([i, movie["title"], movie["release_year"]])
+        table.add_row([i, movie[title_idx], movie[year_idx]])
 
     has_previous = index > 0
     has_next = index + PAGE_SIZE < len(movies)
 
     return table, has_previous, has_next, start_index, end_index
 
+# Runs a batch search query (see RawQueries.GET_MOVIES_BY_*S) for many values and
+# returns {value: ResultSet}. Values are deduplicated and sent in chunks of
+# BATCH_SEARCH_MAX_VALUES, so N values cost ceil(N / chunk) round trips instead of N.
+# Values of a chunk that failed (e.g. timed out) get partial=True result sets, never
+# an empty "no match" one.
+def run_batch_search(db: DBConnection, query_template: str, values) -> dict:
+    unique_values = list(dict.fromkeys(values))
+    grouped = {}
+    for start in range(0, len(unique_values), BATCH_SEARCH_MAX_VALUES):
+        chunk = unique_values[start:start + BATCH_SEARCH_MAX_VALUES]
+        query = query_template.format(values=RawQueries.values_table(len(chunk)))
+        result = db.execute_select(query, tuple(chunk), deadline=RawQueries.deadline_for(query_template))
+        groups = result.group_by("matched")
+
+        # Values without matches still get an (empty) entry.
+        for value in chunk:
+            grouped[value] = groups.get(value, ResultSet(result.columns, partial=result.partial))
+
+    return grouped
+
+
 # Retrieves and displays movie details based on user selection.
-def display_movie_details(db: DBConnection, title: str):
+# Already fetched details (e.g. from the prefetcher) skip the database round trip.
+def display_movie_details(db: DBConnection, title: str, movie=None):
 
-    movie = db.execute_select(RawQueries.GET_MOVIE_DETAILS, (title,))[0]
+    if movie is None:
+        result = db.execute_select(RawQueries.GET_MOVIE_DETAILS, (title,))
+        if not result:
+            logger.info(f"\nDetails for '{title}' are not available right now.")
+            return
+        movie = result[0]
 
     # PrettyTable for structured output
     table = PrettyTable(["Field", "Value"])
-    table.add_row(["Title", movie["title"]])
-    table.add_row(["Year", movie["year"]])
-    table.add_row(["Description", movie["description"]])
-    table.add_row(["Actors", movie["actors"]])
+    table.add_row(["Title", movie.title])
+    table.add_row(["Year", movie.year])
+    table.add_row(["Description", movie.description])
+    table.add_row(["Actors", movie.actors])
 
     logger.info("\033[97m\n" + str(table) + "\033[0m")
 
 # Retrieves the minimum and maximum release years from the database
+# (None if they cannot be loaded right now).
 def get_year_range(db):
     result = db.execute_select(RawQueries.GET_YEAR_RANGE)
-    return result[0]
+    return result[0] if result else None
 
 def is_valid_year(year: str, year_range: dict) -> bool:
     if not year.isdigit():
@@ -2,12 +2,13 @@ import matplotlib.pyplot as plt
 import numpy as np
 from db.db_connector import DBConnection
 from db.raw_queries import RawQueries
+from tasks.log_analytics import get_log_analytics
 from config import MAX_KEYWORDS_BUBBLE
 
 
 # Generates a bar chart of the most popular queries.
 def generate_bar_chart(db: DBConnection):
-    data = db.execute_sqlite_select(RawQueries.GET_TOP_QUERIES, (7,))
+    data = get_log_analytics().top_queries(7)
 
     if not data:
         print("No data available for visualization.")
@@ -64,7 +65,7 @@ def generate_bubble_chart(db: DBConnection):
 
 # Generates a pie chart of search query distribution.
 def generate_pie_chart(db: DBConnection):
-    data = db.execute_sqlite_select(RawQueries.PIE_CHART_QUERY)
+    data = get_log_analytics().type_distribution()
 
     if not data:
         print("No data available for visualization.")
@@ -79,4 +80,22 @@ def generate_pie_chart(db: DBConnection):
         colors=["#800080", "#9932CC", "#BA55D3", "#DA70D6", "#E6E6FA"]
     )
     plt.title("Search Query Distribution")
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+# Generates a histogram of searches per day.
+def generate_time_histogram(db: DBConnection):
+    days, counts = get_log_analytics().time_histogram()
+
+    if not len(counts):
+        print("No data available for visualization.")
+        return
+
+    plt.figure(figsize=(10, 5))
+    plt.bar(days, counts, width=0.8, color="purple")
+
+    plt.xlabel("Day", fontsize=12)
+    plt.ylabel("Searches", fontsize=12)
+    plt.title("Searches Over Time", fontsize=14)
+    plt.xticks(rotation=45, fontsize=10)
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from db.log_merger import LogMerger
+from db.query_logger import QueryLogger
+from tests.test_migrations import BASELINE_SEARCHES, create_baseline_log
+
+
+class LogMergerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.merger = LogMerger(self._path("merged.db"))
+
+    def tearDown(self):
+        self.merger.close()
+        self.tmp_dir.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir.name, name)
+
+    def _node_log(self, name: str, searches: int) -> str:
+        path = self._path(name)
+        logger = QueryLogger(path)
+        for i in range(searches):
+            logger.log_query(keyword=f"word{i % 3}", query_type="keyword")
+        logger.close()
+        return path
+
+    def _merged_events(self) -> int:
+        return self.merger.connection.execute("SELECT COUNT(*) FROM search_events;").fetchone()[0]
+
+    def test_merging_the_same_file_twice_adds_nothing(self):
+        path = self._node_log("node.db", 7)
+        self.assertEqual(self.merger.merge(path), 7)
+        self.assertEqual(self.merger.merge(path), 0)
+        self.assertEqual(self._merged_events(), 7)
+
+    def test_merging_a_baseline_log_twice_adds_nothing(self):
+        path = self._path("baseline.db")
+        create_baseline_log(path)
+        searches = sum(times for *_, times in BASELINE_SEARCHES)
+        self.assertEqual(self.merger.merge(path), searches)
+        self.assertEqual(self.merger.merge(path), 0)
+        self.assertEqual(self._merged_events(), searches)
+
+        # The node file itself is only read, never migrated in place
+        source = sqlite3.connect(path)
+        try:
+            self.assertEqual(source.execute("PRAGMA user_version;").fetchone()[0], 0)
+        finally:
+            source.close()
+
+    def test_grown_log_merges_only_new_events(self):
+        path = self._node_log("node.db", 4)
+        self.merger.merge(path)
+
+        logger = QueryLogger(path)
+        logger.log_query(genre="Action", query_type="genre")
+        logger.close()
+
+        self.assertEqual(self.merger.merge(path), 1)
+        self.assertEqual(self._merged_events(), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
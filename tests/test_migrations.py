@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from db.migrations import LATEST_VERSION, MIGRATIONS, get_version, migrate
+from db.raw_queries import RawQueries
+
+# GET_TOP_QUERIES of the baseline (v1) schema, before the log was normalized.
+BASELINE_TOP_QUERIES = """
+    SELECT query_type,
+        CASE
+            WHEN query_type = 'genre' THEN 'Genre: ' || genre
+            WHEN query_type = 'year' THEN 'Year: ' || production_year
+            WHEN query_type = 'keyword' THEN 'Keyword: ' || keyword
+            WHEN query_type = 'genre_year' THEN 'Genre: ' || genre || ', Year: ' || production_year
+            WHEN query_type = 'actor' THEN 'Actor: ' || keyword
+        END AS search_text,
+        COUNT(*) AS search_count
+    FROM queries_log
+    WHERE query_type IN ('genre', 'year', 'keyword', 'genre_year', 'actor')
+    GROUP BY query_type, search_text
+    ORDER BY search_count DESC
+    LIMIT ?;
+    """
+
+# (genre, production_year, keyword, query_type, times searched)
+BASELINE_SEARCHES = [
+    ("Action", None, None, "genre", 5),
+    ("Comedy", None, None, "genre", 2),
+    (None, 2006, None, "year", 4),
+    (None, None, "dragon", "keyword", 3),
+    (None, None, "Penelope Guiness", "actor", 6),
+    ("Drama", 2006, None, "genre_year", 1),
+]
+
+
+# Creates a query log in the baseline (v1) format, as written before migrations existed.
+def create_baseline_log(path: str, searches: list[tuple] = BASELINE_SEARCHES):
+    connection = sqlite3.connect(path)
+    with connection:
+        for statement in MIGRATIONS[0][2]:
+            connection.execute(statement)
+        for genre, year, keyword, query_type, times in searches:
+            for _ in range(times):
+                cursor = connection.execute(
+                    "INSERT INTO queries_log (genre, production_year, keyword, query_type) VALUES (?, ?, ?, ?);",
+                    (genre, year, keyword, query_type),
+                )
+                if query_type == "keyword":
+                    connection.execute(
+                        "INSERT INTO keywords_log (query_id, keyword) VALUES (?, ?);", (cursor.lastrowid, keyword)
+                    )
+    connection.close()
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "queries_log.db")
+        create_baseline_log(self.path)
+        self.connection = sqlite3.connect(self.path)
+
+    def tearDown(self):
+        self.connection.close()
+        self.tmp_dir.cleanup()
+
+    def test_top_query_counts_survive_migration(self):
+        limit = len(BASELINE_SEARCHES)
+        before = self.connection.execute(BASELINE_TOP_QUERIES, (limit,)).fetchall()
+
+        self.assertEqual(migrate(self.connection), LATEST_VERSION)
+        after = self.connection.execute(RawQueries.GET_TOP_QUERIES, (limit,)).fetchall()
+
+        self.assertEqual(sorted(after), sorted(before))
+        self.assertEqual([row[2] for row in after], sorted((row[2] for row in before), reverse=True))
+
+    def test_migration_keeps_event_ids(self):
+        ids = [row[0] for row in self.connection.execute("SELECT id FROM queries_log ORDER BY id;")]
+        migrate(self.connection)
+        events = [row[0] for row in self.connection.execute("SELECT id FROM search_events ORDER BY id;")]
+        self.assertEqual(events, ids)
+
+    def test_migrate_is_idempotent(self):
+        migrate(self.connection)
+        self.assertEqual(migrate(self.connection), 0)
+        self.assertEqual(get_version(self.connection), LATEST_VERSION)
+
+
+if __name__ == "__main__":
+    unittest.main()